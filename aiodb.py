@@ -0,0 +1,49 @@
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine
+
+#----------------------------------------------------------------------------#
+# Async database access for the ASGI mode .
+# asgi.py serves some views as coroutines, they run on the server event loop
+# and read through this engine so independent queries can run at once .
+#----------------------------------------------------------------------------#
+
+ASYNC_DRIVERS = {'postgresql': 'postgresql+asyncpg', 'sqlite': 'sqlite+aiosqlite'}
+
+
+def async_url(url):
+    """ Same database as url, on the async driver of its dialect . """
+    url = make_url(url)
+    return url.set(drivername=ASYNC_DRIVERS[url.get_backend_name()])
+
+
+class AsyncDatabase:
+    """ Async engine next to Flask-SQLAlchemy . It is made on first use, from
+    inside the event loop its pooled connections then belong to . """
+
+    def __init__(self, app=None):
+        self.engine = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.url = async_url(app.config['SQLALCHEMY_DATABASE_URI'])
+        self.options = app.config.get('ASYNC_ENGINE_OPTIONS', {})
+
+    def get_engine(self):
+        if self.engine is None:
+            self.engine = create_async_engine(self.url, **self.options)
+        return self.engine
+
+    async def first(self, statement):
+        """ First row of statement, on a connection of its own . """
+        async with self.get_engine().connect() as connection:
+            return (await connection.execute(statement)).first()
+
+    async def all(self, statement):
+        async with self.get_engine().connect() as connection:
+            return (await connection.execute(statement)).all()
+
+    async def dispose(self):
+        if self.engine is not None:
+            await self.engine.dispose()
+            self.engine = None
@@ -0,0 +1,150 @@
+import gzip
+import hmac
+import json
+
+from flask import Blueprint, Response, abort, current_app, request, stream_with_context
+from werkzeug.exceptions import HTTPException
+
+from bulk import EXPORT_MIMETYPES, export_chunks, gzip_chunks
+from models import db, Artist, Show, Venue, ARTIST_FIELDS, SHOW_FIELDS, VENUE_FIELDS, to_dict
+from pages import live, paginate, show_window
+
+api = Blueprint('api', __name__, url_prefix='/api/v1')
+exports = Blueprint('exports', __name__)
+
+
+#----------------------------------------------------------------------------#
+# Export.
+#----------------------------------------------------------------------------#
+
+EXPORTS = {
+    'venues': (Venue, VENUE_FIELDS),
+    'artists': (Artist, ARTIST_FIELDS),
+    'shows': (Show, SHOW_FIELDS),
+}
+
+
+def export_rows(kind):
+    """ Every row of kind in id order, fetched through a server-side
+    cursor in batches of EXPORT_BATCH_SIZE . """
+    model, fields = EXPORTS[kind]
+    return db.session.query(*[getattr(model, field) for field in fields])\
+        .filter(*live(model)).order_by(model.id).yield_per(current_app.config['EXPORT_BATCH_SIZE'])
+
+
+@exports.route('/export/<any(venues, artists, shows):kind>')
+def export(kind):
+    token = current_app.config.get('EXPORT_TOKEN')
+    supplied = request.headers.get('Authorization', '').removeprefix('Bearer ')
+    if not token or not hmac.compare_digest(supplied, token):
+        abort(403)
+    fmt = request.args.get('format', 'ndjson')
+    if fmt not in EXPORT_MIMETYPES:
+        abort(400, 'format must be ndjson or csv')
+    chunks = export_chunks(export_rows(kind), EXPORTS[kind][1], fmt)
+    headers = {'Content-Disposition': f'attachment; filename={kind}.{fmt}'}
+    if 'gzip' in request.accept_encodings:
+        chunks = gzip_chunks(chunks)
+        headers['Content-Encoding'] = 'gzip'
+    # No Content-Length, the response goes out with chunked transfer encoding .
+    return Response(stream_with_context(chunks), mimetype=EXPORT_MIMETYPES[fmt],
+                    headers=headers)
+
+
+#----------------------------------------------------------------------------#
+# API.
+#----------------------------------------------------------------------------#
+
+API_RESOURCES = {
+    # name: (model, public fields, sort columns, foreign key of its shows)
+    'venues': (Venue, VENUE_FIELDS, lambda: [Venue.id], Show.venue_id),
+    'artists': (Artist, ARTIST_FIELDS, lambda: [Artist.id], Show.artist_id),
+    'shows': (Show, SHOW_FIELDS, lambda: [Show.start_time, Show.id], None),
+}
+
+
+def api_response(payload, status=200):
+    """ JSON response, gzipped when the client accepts it and it's worth it . """
+    body = json.dumps(payload, default=lambda value: value.isoformat(),
+                      separators=(',', ':')).encode()
+    response = Response(body, status=status, mimetype='application/json')
+    response.vary.add('Accept-Encoding')
+    if len(body) > current_app.config['API_GZIP_MIN_SIZE'] and 'gzip' in request.accept_encodings:
+        response.set_data(gzip.compress(body, compresslevel=6))
+        response.headers['Content-Encoding'] = 'gzip'
+    return response
+
+
+def requested_fields(allowed):
+    """ Columns asked for with ?fields=a,b ( id is always included ) . """
+    if not request.args.get('fields'):
+        return allowed
+    fields = [field for field in request.args['fields'].split(',') if field]
+    unknown = set(fields) - set(allowed)
+    if unknown:
+        abort(400, f"Unknown fields: {', '.join(sorted(unknown))}")
+    return ('id',) + tuple(field for field in fields if field != 'id')
+
+
+def shows_by(foreign_key, ids):
+    """ Shows of many venues / artists in one query, keyed by owner id . """
+    shows = {}
+    rows = db.session.query(*[getattr(Show, field) for field in SHOW_FIELDS])\
+        .filter(foreign_key.in_(ids), *live(Show)).order_by(Show.start_time)
+    for row in rows:
+        shows.setdefault(getattr(row, foreign_key.key), []).append(to_dict(row, SHOW_FIELDS))
+    return shows
+
+
+def api_rows(resource, query_filter=None):
+    model, allowed, sort_columns, foreign_key = API_RESOURCES[resource]
+    fields = requested_fields(allowed)
+    columns = sort_columns()
+    # Only the requested columns are selected, plus the sort key for the cursor .
+    selected = [getattr(model, field) for field in fields]
+    selected += [column for column in columns if column.key not in fields]
+    query = db.session.query(*selected).filter(*live(model))
+    if query_filter is not None:
+        query = query.filter(query_filter)
+    return query, fields, columns, foreign_key
+
+
+def include_shows(data, foreign_key):
+    if foreign_key is not None and 'shows' in request.args.get('include', '').split(','):
+        shows = shows_by(foreign_key, [item['id'] for item in data])
+        for item in data:
+            item['shows'] = shows.get(item['id'], [])
+
+
+@api.route('/<any(venues, artists, shows):resource>')
+def api_list(resource):
+    window = show_window() if resource == 'shows' else []
+    query, fields, columns, foreign_key = api_rows(resource, db.and_(*window) if window else None)
+    page = paginate(query, columns,
+                    key=lambda row: tuple(getattr(row, column.key) for column in columns))
+    data = [to_dict(row, fields) for row in page.items]
+    include_shows(data, foreign_key)
+    return api_response({
+        'data': data,
+        'next_cursor': page.next_cursor,
+        'prev_cursor': page.prev_cursor,
+    })
+
+
+@api.route('/<any(venues, artists, shows):resource>/<int:entity_id>')
+def api_detail(resource, entity_id):
+    model = API_RESOURCES[resource][0]
+    query, fields, columns, foreign_key = api_rows(resource, model.id == entity_id)
+    row = query.first()
+    if row is None:
+        abort(404)
+    data = [to_dict(row, fields)]
+    include_shows(data, foreign_key)
+    return api_response({'data': data[0]})
+
+
+@api.errorhandler(400)
+@api.errorhandler(404)
+@api.errorhandler(HTTPException)
+def api_error(error):
+    return api_response({'error': error.description}, status=error.code)
@@ -0,0 +1,173 @@
+from flask import Blueprint, abort, current_app, flash, jsonify, redirect, render_template, request, url_for
+
+from models import db, Artist, ArtistGenre, Show, Venue, ARTIST_FIELDS, to_dict
+from pages import (ARTIST_SHOW_COLUMNS, artist_namespaces, artist_show, cancel_shows, conditional,
+                   detail_last_modified, detail_page, detail_versions, genre_facets, genre_filter,
+                   live, paginate, requested_genres, search_page, searcher, soft_delete,
+                   split_shows, table_versions, view_cache)
+from replicas import replica_reads
+
+bp = Blueprint('artists', __name__)
+
+
+#  Artists
+#  ----------------------------------------------------------------
+@bp.route('/artists')
+def artists():
+    genres = requested_genres()
+    def render():
+        query = db.session.query(Artist.id, Artist.name, Artist.updated_at).filter(*live(Artist))
+        if genres:
+            query = query.filter(Artist.id.in_(genre_filter(ArtistGenre, 'artist_id', genres)))
+        page = paginate(query, [Artist.id], key=lambda row: (row.id,))
+        data = [{
+            "id": art.id,
+            "name": art.name,
+            "updated_at": art.updated_at,
+        } for art in page.items]
+        return render_template('pages/artists.html', artists=data, page=page,
+                               facets=genre_facets(ArtistGenre, 'artist_id', genres))
+    versions = table_versions(Artist)
+    return conditional(versions, versions[0], render)
+
+#   SEARCH artist
+@bp.route('/artists/search', methods=['POST'])
+@replica_reads
+def search_artists():
+    response = search_page(Artist)
+    return render_template('pages/search_artists.html', results=response, search_term=request.form.get('search_term', ''))
+
+
+# GET Artist by ID
+@bp.route('/artists/<int:artist_id>')
+def show_artist(artist_id):
+    def build():
+        # The artist and all its shows in one query, split around a single now .
+        rows = db.session.query(Artist, *ARTIST_SHOW_COLUMNS).select_from(Artist)\
+            .outerjoin(Show, db.and_(Show.artist_id == Artist.id, *live(Show)))\
+            .outerjoin(Venue, Venue.id == Show.venue_id)\
+            .filter(Artist.id == artist_id, *live(Artist))\
+            .order_by(Show.start_time).all()
+        if not rows:
+            return None
+        artist = rows[0][0]
+        past_shows, upcomingShow = split_shows(rows, artist_show)
+        return detail_page(artist, ARTIST_FIELDS, past_shows, upcomingShow)
+    def render():
+        data = view_cache.get_or_set(f'artist:{artist_id}', versions, build)
+        if data is None:
+            abort(404)
+        return render_template('pages/show_artist.html', artist=data)
+    versions = detail_versions(Artist, artist_id, Show.artist_id, Venue, Show.venue_id)
+    if versions is None:
+        abort(404)
+    return conditional(versions, detail_last_modified(versions), render)
+
+# DELETE Artist by ID .
+@bp.route('/artists/<int:artist_id>', methods=['DELETE'])
+def delete_artist(artist_id):
+    # The artist is tombstoned and its upcoming shows cancelled, its counters,
+    # genre index rows and shows are left to purge-deleted .
+    try:
+        name = soft_delete(Artist, artist_id)
+        if name is None:
+            return jsonify({'success': False}), 404
+        stale = artist_namespaces(artist_id)
+        cancel_shows(Show.artist_id == artist_id)
+        db.session.commit()
+        searcher(Artist).remove(artist_id)
+        # Venue listings show the upcoming show counts .
+        view_cache.invalidate(*stale, 'venues')
+        flash(f'{name} Artist was deleted')
+    except Exception:
+        current_app.logger.exception('Deleting artist %s failed', artist_id)
+        db.session.rollback()
+        return jsonify({'success': False}), 500
+    return jsonify({'success': True})
+
+#  UPDATE Artist .
+#  ----------------------------------------------------------------
+@bp.route('/artists/<int:artist_id>/edit', methods=['GET'])
+def edit_artist(artist_id):
+    from forms import ArtistForm
+    artist = Artist.query.get(artist_id)
+    form = ArtistForm(obj=artist)
+    artist = to_dict(artist, ARTIST_FIELDS)
+    return render_template('forms/edit_artist.html', form=form, artist=artist)
+
+ # UPDATE Artist , send updated data.
+
+
+@bp.route('/artists/<int:artist_id>/edit', methods=['POST'])
+def edit_artist_submission(artist_id):
+    try:
+        artist = Artist.query.get(artist_id)
+        artist.name = request.form['name']
+        artist.city = request.form['city']
+        artist.state = request.form['state']
+        artist.phone = request.form['phone']
+        artist.genres = request.form.getlist('genres')
+        artist.website = request.form['website']
+        artist.image_link = request.form['image_link']
+        artist.seeking_venue = request.form.get('talent') == 'y'
+        artist.seeking_description = request.form['description']
+        artist.facebook_link = request.form['facebook_link']
+        stale = artist_namespaces(artist_id)
+        db.session.commit()
+        searcher(Artist).add(artist)
+        view_cache.invalidate(*stale)
+        flash('Artist  ' + artist.name + ' updated')
+    except Exception:
+        flash('Failed update')
+        current_app.logger.exception('Updating artist %s failed', artist_id)
+        db.session.rollback()
+    return redirect(url_for('artists.show_artist', artist_id=artist_id))
+
+
+#  Create Artist
+#  ----------------------------------------------------------------
+
+
+@bp.route('/artists/create', methods=['GET'])
+def create_artist_form():
+    from forms import ArtistForm
+    form = ArtistForm()
+    return render_template('forms/new_artist.html', form=form)
+
+
+@bp.route('/artists/create', methods=['POST'])
+def create_artist_submission():
+    try:
+        name = request.form['name']
+        city = request.form['city']
+        state = request.form['state']
+        phone = request.form['phone']
+        image_link = request.form['image_link']
+        genres = request.form.getlist('genres')
+        facebook_link = request.form['facebook_link']
+        website = request.form['website']
+        talent = request.form.get('talent')
+        description = request.form['description']
+        if talent:
+            talent = True
+        else:
+            talent = False
+        artist = Artist(name=name, city=city, state=state,
+                        phone=phone,
+                        genres=genres,
+                        image_link=image_link,
+                        website=website,
+                        facebook_link=facebook_link, seeking_venue=talent,
+                        seeking_description=description)
+        db.session.add(artist)
+        db.session.commit()
+        searcher(Artist).add(artist)
+        view_cache.invalidate(f'artist:{artist.id}')
+        flash('Artist ' + request.form['name'] +
+              ' was successfully listed! 💪🏻')
+    except Exception:
+        flash('Artist ' + request.form['name'] + ' Failed inserted 😕')
+        current_app.logger.exception('Creating an artist failed')
+        db.session.rollback()
+    # on successful db insert, flash success
+    return render_template('pages/home.html')
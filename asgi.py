@@ -0,0 +1,77 @@
+"""
+ASGI entry point, the same app and templates with the venue and artist pages
+served as coroutines on an async engine :
+
+    $ uvicorn asgi:application --workers 4
+
+Every other route still runs as the sync Flask view, in the adapter threads .
+"""
+import asyncio
+from datetime import datetime, timezone
+
+from asgiref.wsgi import WsgiToAsgi
+from flask import Response, abort, make_response, render_template
+
+from aiodb import AsyncDatabase
+from app import create_app
+from models import db, Artist, Show, Venue, ARTIST_FIELDS, VENUE_FIELDS
+from pages import (ARTIST_SHOW_COLUMNS, VENUE_SHOW_COLUMNS, artist_show, detail_last_modified,
+                   detail_page, detail_versions_query, live, validators, venue_show, view_cache,
+                   with_validators)
+
+app = create_app()
+async_db = AsyncDatabase(app)
+
+
+async def detail(model, fields, entity_id, foreign_key, other, other_key, columns, make_show):
+    """ The detail page dict, the entity, its past shows and its upcoming
+    shows are three queries running at the same time . """
+    now = datetime.now(timezone.utc)
+    shows = db.select(*columns).select_from(Show)\
+        .join(other, other.id == other_key)\
+        .where(foreign_key == entity_id, *live(Show))\
+        .order_by(Show.start_time)
+    entity, past, upcoming = await asyncio.gather(
+        async_db.first(db.select(*model.__table__.c).where(model.id == entity_id, *live(model))),
+        async_db.all(shows.where(Show.start_time <= now)),
+        async_db.all(shows.where(Show.start_time > now)))
+    if entity is None:
+        return None
+    return detail_page(entity, fields, [make_show(row) for row in past],
+                       [make_show(row) for row in upcoming])
+
+
+async def detail_response(namespace, template, name, model, fields, entity_id,
+                          foreign_key, other, other_key, columns, make_show):
+    versions = await async_db.first(
+        detail_versions_query(model, entity_id, foreign_key, other, other_key))
+    if versions is None:
+        abort(404)
+    etag, last_modified, not_modified = validators(versions, detail_last_modified(versions))
+    if not_modified:
+        return with_validators(Response(status=304), etag, last_modified)
+    data = await view_cache.get_or_set_async(namespace, versions, lambda: detail(
+        model, fields, entity_id, foreign_key, other, other_key, columns, make_show))
+    if data is None:
+        abort(404)
+    return with_validators(make_response(render_template(template, **{name: data})),
+                           etag, last_modified)
+
+
+async def show_venue(venue_id):
+    return await detail_response(f'venue:{venue_id}', 'pages/show_venue.html', 'venue',
+                                 Venue, VENUE_FIELDS, venue_id, Show.venue_id,
+                                 Artist, Show.artist_id, VENUE_SHOW_COLUMNS, venue_show)
+
+
+async def show_artist(artist_id):
+    return await detail_response(f'artist:{artist_id}', 'pages/show_artist.html', 'artist',
+                                 Artist, ARTIST_FIELDS, artist_id, Show.artist_id,
+                                 Venue, Show.venue_id, ARTIST_SHOW_COLUMNS, artist_show)
+
+
+# Same url rules, the endpoints now point at the coroutines .
+app.view_functions['venues.show_venue'] = show_venue
+app.view_functions['artists.show_artist'] = show_artist
+
+application = WsgiToAsgi(app)
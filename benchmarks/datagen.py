@@ -0,0 +1,179 @@
+"""
+Fill a local database with synthetic venues, artists and shows, the same
+rows for the same seed so benchmark runs on different commits compare :
+
+    $ export DATABASE_URL=postgresql://localhost/fyyur_bench
+    $ flask db upgrade
+    $ python -m benchmarks.datagen --venues 2000 --artists 5000 --shows 50000 --seed 1
+
+Cities follow a long tail ( a few big cities hold most venues ), genres come
+from `Geners` with a few popular ones, show times spread over the year
+around the day it runs . Rows go through the `flask import` writers, so
+genre index rows and upcoming show counters are filled in as usual ; shows
+that would double book a venue or an artist are skipped and counted . Use
+an empty, dedicated database : nothing is deleted first .
+"""
+import argparse
+import random
+import time
+from datetime import datetime, timedelta, timezone
+
+# (city, state, timezone), biggest first : the n-th city gets a 1 / n share .
+CITIES = [
+    ('New York', 'NY', 'America/New_York'),
+    ('Los Angeles', 'CA', 'America/Los_Angeles'),
+    ('Chicago', 'IL', 'America/Chicago'),
+    ('Houston', 'TX', 'America/Chicago'),
+    ('Phoenix', 'AZ', 'America/Phoenix'),
+    ('Philadelphia', 'PA', 'America/New_York'),
+    ('San Antonio', 'TX', 'America/Chicago'),
+    ('San Diego', 'CA', 'America/Los_Angeles'),
+    ('Dallas', 'TX', 'America/Chicago'),
+    ('San Francisco', 'CA', 'America/Los_Angeles'),
+    ('Austin', 'TX', 'America/Chicago'),
+    ('Seattle', 'WA', 'America/Los_Angeles'),
+    ('Denver', 'CO', 'America/Denver'),
+    ('Nashville', 'TN', 'America/Chicago'),
+    ('Boston', 'MA', 'America/New_York'),
+    ('Portland', 'OR', 'America/Los_Angeles'),
+    ('Detroit', 'MI', 'America/Detroit'),
+    ('Memphis', 'TN', 'America/Chicago'),
+    ('New Orleans', 'LA', 'America/Chicago'),
+    ('Atlanta', 'GA', 'America/New_York'),
+    ('Miami', 'FL', 'America/New_York'),
+    ('Minneapolis', 'MN', 'America/Chicago'),
+    ('Kansas City', 'MO', 'America/Chicago'),
+    ('Honolulu', 'HI', 'Pacific/Honolulu'),
+]
+
+WORDS = ['Blue', 'Red', 'Velvet', 'Golden', 'Electric', 'Midnight', 'Silver', 'Wild',
+         'Lucky', 'Broken', 'Neon', 'Hollow', 'Crystal', 'Rusty', 'Little', 'Big']
+VENUE_KINDS = ['Hall', 'Lounge', 'Club', 'Room', 'Theatre', 'Bar', 'Garden', 'Stage']
+ARTIST_KINDS = ['Band', 'Trio', 'Quartet', 'Collective', 'Orchestra', 'Project', 'Brothers', 'Sisters']
+STREETS = ['Main St', 'Oak Ave', 'Market St', 'Broadway', 'Elm St', '2nd Ave', 'Pine St', 'Lake Dr']
+
+# Past and future spread of the show times, most listings have both .
+SHOW_SPAN_DAYS = 365
+SHOW_MINUTES = [60, 90, 120, 180]
+
+
+def genre_names():
+    from geners import Geners
+    return [genre.value for genre in Geners]
+
+
+class Generator:
+    """ Records of the import writers, all drawn from one seeded Random . """
+
+    def __init__(self, seed):
+        self.random = random.Random(seed)
+        self.city_weights = [1 / rank for rank in range(1, len(CITIES) + 1)]
+        # Which genres are popular is part of the seed too .
+        self.genres = self.random.sample(genre_names(), len(genre_names()))
+        self.genre_weights = [1 / rank ** 0.8 for rank in range(1, len(self.genres) + 1)]
+        # Shows are placed around today, runs on the same day write the same times .
+        self.now = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+
+    def city(self):
+        return self.random.choices(CITIES, self.city_weights)[0]
+
+    def pick_genres(self):
+        count = self.random.choice([1, 1, 2, 2, 3])
+        picked = []
+        while len(picked) < count:
+            genre = self.random.choices(self.genres, self.genre_weights)[0]
+            if genre not in picked:
+                picked.append(genre)
+        return picked
+
+    def name(self, index, kinds):
+        return f'{self.random.choice(WORDS)} {self.random.choice(WORDS)} {self.random.choice(kinds)} {index}'
+
+    def phone(self):
+        return f'{self.random.randint(200, 999)}-{self.random.randint(200, 999)}-{self.random.randint(0, 9999):04d}'
+
+    def venue(self, index):
+        city, state, tz = self.city()
+        seeking = self.random.random() < 0.3
+        return {
+            'name': self.name(index, VENUE_KINDS), 'city': city, 'state': state, 'timezone': tz,
+            'address': f'{self.random.randint(1, 9999)} {self.random.choice(STREETS)}',
+            'phone': self.phone(), 'genres': self.pick_genres(),
+            'image_link': f'https://images.example.com/venues/{index}.jpg',
+            'facebook_link': f'https://www.facebook.com/venue{index}',
+            'website': f'https://venue{index}.example.com',
+            'seeking_talent': seeking,
+            'seeking_description': 'Looking for local acts.' if seeking else None,
+        }
+
+    def artist(self, index):
+        city, state, _ = self.city()
+        seeking = self.random.random() < 0.4
+        return {
+            'name': self.name(index, ARTIST_KINDS), 'city': city, 'state': state,
+            'phone': self.phone(), 'genres': self.pick_genres(),
+            'image_link': f'https://images.example.com/artists/{index}.jpg',
+            'facebook_link': f'https://www.facebook.com/artist{index}',
+            'website': f'https://artist{index}.example.com',
+            'seeking_venue': seeking,
+            'seeking_description': 'Touring, looking for venues.' if seeking else None,
+        }
+
+    def show(self, venue_ids, artist_ids):
+        # Busy venues and artists : ids early in the list get more shows .
+        venue_id = venue_ids[min(int(self.random.expovariate(3 / len(venue_ids))), len(venue_ids) - 1)]
+        artist_id = artist_ids[min(int(self.random.expovariate(3 / len(artist_ids))), len(artist_ids) - 1)]
+        start = self.now + timedelta(days=self.random.randint(-SHOW_SPAN_DAYS, SHOW_SPAN_DAYS),
+                                     hours=self.random.randint(-6, 6))
+        return {'venue_id': venue_id, 'artist_id': artist_id, 'start_time': start,
+                'duration': self.random.choice(SHOW_MINUTES)}
+
+
+def generate(venues, artists, shows, seed, batch_size, echo=print):
+    """ Write the rows inside an app context, returns the counts written . """
+    from commands import write_entities, write_shows
+    from models import db, Artist, Venue
+    from pages import searcher, view_cache
+    generator = Generator(seed)
+    counts = {}
+    for model, count, make in ((Venue, venues, generator.venue), (Artist, artists, generator.artist)):
+        for first in range(0, count, batch_size):
+            write_entities(model, [make(index) for index in range(first + 1, min(first + batch_size, count) + 1)])
+            db.session.commit()
+        counts[model.__tablename__] = count
+        echo(f'{count} {model.__tablename__} rows')
+    venue_ids = db.session.scalars(db.select(Venue.id).order_by(Venue.id)).all()
+    artist_ids = db.session.scalars(db.select(Artist.id).order_by(Artist.id)).all()
+    written = rejected = 0
+    if venue_ids and artist_ids:
+        for first in range(0, shows, batch_size):
+            batch = [generator.show(venue_ids, artist_ids) for _ in range(min(batch_size, shows - first))]
+            skipped = len(write_shows(batch))
+            written, rejected = written + len(batch) - skipped, rejected + skipped
+            db.session.commit()
+    counts['show'] = written
+    echo(f"{counts['show']} show rows, {rejected} skipped as double bookings")
+    for model in (Venue, Artist):
+        searcher(model).reset()
+    view_cache.clear()
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--venues', type=int, default=1000)
+    parser.add_argument('--artists', type=int, default=2000)
+    parser.add_argument('--shows', type=int, default=20000)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--batch-size', type=int, default=1000)
+    args = parser.parse_args()
+    from app import create_app
+    started = time.perf_counter()
+    with create_app().app_context():
+        generate(args.venues, args.artists, args.shows, args.seed, args.batch_size)
+    print(f'Done in {time.perf_counter() - started:.1f} s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+"""
+Per-row cost of the show times on a 10k-show page, the old path ( strftime,
+dateutil parse and babel in the view, parse and babel again in the template )
+against the `datetime` filter of dates.py, cold and memoized :
+
+    $ python -m benchmarks.datetime_format
+    $ python -m benchmarks.datetime_format --rows 50000 --distinct 2000
+
+No database needed, the show times are generated . --distinct is how many
+different start times the page has ( shows share hours ) .
+"""
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+
+from dates import _format, compiled_pattern, format_datetime
+
+
+def legacy_format(value, format='medium'):
+    """ format_datetime as it was, text in and text out . """
+    import babel.dates
+    import dateutil.parser
+    date = dateutil.parser.parse(value)
+    if format == 'full':
+        format = "EEEE MMMM, d, y 'at' h:mma"
+    elif format == 'medium':
+        format = "EE MM, dd, y h:mma"
+    return babel.dates.format_datetime(date, format)
+
+
+def legacy_row(value):
+    # The view formatted the date, the template filter formatted it again .
+    return legacy_format(legacy_format(value.strftime('%Y-%m-%d')), 'full')
+
+
+def show_times(rows, distinct, seed=0):
+    rng = random.Random(seed)
+    start = datetime(2035, 1, 1, 18)
+    times = [start + timedelta(days=rng.randrange(365), hours=rng.randrange(6))
+             for _ in range(distinct)]
+    return [rng.choice(times) for _ in range(rows)]
+
+
+def timed(format_row, values):
+    started = time.perf_counter()
+    for value in values:
+        format_row(value)
+    return (time.perf_counter() - started) * 1e6 / len(values)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=10000)
+    parser.add_argument('--distinct', type=int, default=1000)
+    args = parser.parse_args()
+    values = show_times(args.rows, args.distinct)
+
+    legacy_row(values[0])  # imports and locale data out of the timings
+    legacy = timed(legacy_row, values)
+    compiled_pattern.cache_clear()
+    _format.cache_clear()
+    cold = timed(lambda value: format_datetime(value, 'full'), values)
+    warm = timed(lambda value: format_datetime(value, 'full'), values)
+
+    print(f"{args.rows} rows, {args.distinct} distinct start times")
+    print(f"{'':20} {'us/row':>10} {'page ms':>10} {'speedup':>9}")
+    for name, per_row in (('legacy', legacy), ('filter, first page', cold),
+                          ('filter, memoized', warm)):
+        print(f"{name:20} {per_row:10.2f} {per_row * args.rows / 1000:10.1f} "
+              f"{legacy / per_row:8.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,170 @@
+"""
+Drive the main pages in process through the test client, no server and no
+network, and record throughput and latency percentiles per route :
+
+    $ python -m benchmarks.datagen --seed 1       # once, on a dedicated database
+    $ python -m benchmarks.driver --label before
+    $ git checkout my-branch
+    $ python -m benchmarks.driver --label after
+    $ python -m benchmarks.driver --compare before after
+
+The script hits /venues, /shows, a venue, an artist and both searches in
+turn; the ids and search terms are drawn from the database with --seed, so
+the same data gives the same requests . The view cache is off unless
+--cache, otherwise every repeat is a cache hit . Exits with 1 when a request
+fails . Results go to benchmarks/results/driver-<label>.json with the
+commit they were measured on .
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import time
+from datetime import datetime
+
+from benchmarks.loadtest import percentile
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), 'results')
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+ROUTES = ['venues', 'shows', 'venue_detail', 'artist_detail', 'search_venues', 'search_artists']
+# Ids and search terms drawn per route .
+SAMPLES = 50
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, check=True,
+                              capture_output=True, text=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def script(seed):
+    """ {route: [(method, path, form data)]} drawn from the database . """
+    from models import db, Artist, Venue
+    from pages import live
+    rng = random.Random(seed)
+    def sample(query):
+        rows = db.session.execute(query).scalars().all()
+        return rng.sample(rows, min(SAMPLES, len(rows))) if rows else []
+    venue_ids = sample(db.select(Venue.id).where(*live(Venue)).order_by(Venue.id))
+    artist_ids = sample(db.select(Artist.id).where(*live(Artist)).order_by(Artist.id))
+    if not venue_ids or not artist_ids:
+        raise SystemExit('No venues or artists, fill the database with benchmarks.datagen first')
+    def terms(model):
+        names = sample(db.select(model.name).where(*live(model)).order_by(model.id))
+        # Words of the names, not the numbers datagen appends .
+        return [rng.choice([word for word in name.split() if not word.isdigit()] or name.split())
+                for name in names if name]
+    return {
+        'venues': [('GET', '/venues', None)],
+        'shows': [('GET', '/shows', None)],
+        'venue_detail': [('GET', f'/venues/{venue_id}', None) for venue_id in venue_ids],
+        'artist_detail': [('GET', f'/artists/{artist_id}', None) for artist_id in artist_ids],
+        'search_venues': [('POST', '/venues/search', {'search_term': term}) for term in terms(Venue)],
+        'search_artists': [('POST', '/artists/search', {'search_term': term}) for term in terms(Artist)],
+    }
+
+
+def run(client, requests, warmup, routes):
+    """ Send requests per route, the routes taking turns, and time each one . """
+    timings = {route: [] for route in routes}
+    errors = dict.fromkeys(routes, 0)
+    for turn in range(warmup + requests):
+        for route, calls in routes.items():
+            method, path, data = calls[turn % len(calls)]
+            started = time.perf_counter()
+            response = client.open(path, method=method, data=data)
+            response.get_data()
+            elapsed = (time.perf_counter() - started) * 1000
+            if turn < warmup:
+                continue
+            if response.status_code >= 400:
+                errors[route] += 1
+            timings[route].append(elapsed)
+    result = {}
+    for route, route_timings in timings.items():
+        route_timings.sort()
+        result[route] = {
+            'requests': len(route_timings),
+            'errors': errors[route],
+            'requests_per_sec': round(len(route_timings) / (sum(route_timings) / 1000), 1),
+            'mean_ms': round(sum(route_timings) / len(route_timings), 3),
+            'p50_ms': round(percentile(route_timings, 0.50), 3),
+            'p90_ms': round(percentile(route_timings, 0.90), 3),
+            'p99_ms': round(percentile(route_timings, 0.99), 3),
+            'max_ms': round(route_timings[-1], 3),
+        }
+    return result
+
+
+def record(label, requests, warmup, seed, cache):
+    if not cache:
+        os.environ['CACHE_BACKEND'] = 'none'
+    from app import create_app
+    from models import db, Artist, Show, Venue
+    app = create_app()
+    with app.app_context():
+        routes = script(seed)
+        rows = {model.__tablename__: db.session.query(model).count() for model in (Venue, Artist, Show)}
+        dialect = db.engine.dialect.name
+    started = time.perf_counter()
+    result = run(app.test_client(), requests, warmup, routes)
+    elapsed = time.perf_counter() - started
+    total = sum(route['requests'] for route in result.values())
+    failed = sum(route['errors'] for route in result.values())
+    for route, timing in result.items():
+        print(f"{route:15} {timing['requests_per_sec']:8.1f} req/s   p50 {timing['p50_ms']:7.1f} ms   "
+              f"p99 {timing['p99_ms']:7.1f} ms   {timing['errors']} errors")
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    path = os.path.join(RESULTS_DIR, f'driver-{label}.json')
+    with open(path, 'w') as output:
+        json.dump({'label': label, 'recorded_at': datetime.now().isoformat(), 'commit': git_commit(),
+                   'python': platform.python_version(), 'database': dialect, 'rows': rows,
+                   'seed': seed, 'cache': cache, 'requests': total, 'errors': failed,
+                   'requests_per_sec': round(total / elapsed, 1) if elapsed else 0.0,
+                   'routes': result}, output, indent=2)
+    print(f'Saved {path}')
+    return failed
+
+
+def compare(first, second):
+    runs = []
+    for label in (first, second):
+        with open(os.path.join(RESULTS_DIR, f'driver-{label}.json')) as result:
+            runs.append(json.load(result))
+    print(f"commits {runs[0]['commit']} -> {runs[1]['commit']}")
+    if runs[0]['rows'] != runs[1]['rows']:
+        print(f"different data: {runs[0]['rows']} vs {runs[1]['rows']}")
+    print(f"{'':32} {first:>12} {second:>12} {'ratio':>9}")
+    for route in ROUTES:
+        for metric in ('requests_per_sec', 'p50_ms', 'p99_ms'):
+            a, b = runs[0]['routes'][route][metric], runs[1]['routes'][route][metric]
+            ratio = f'{b / a:8.2f}x' if a else f"{'-':>9}"
+            print(f"{route + ' ' + metric:32} {a:12} {b:12} {ratio}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--label', help='name of this run, e.g. a branch or commit')
+    parser.add_argument('--requests', type=int, default=200, help='timed requests per route')
+    parser.add_argument('--warmup', type=int, default=10, help='untimed requests per route first')
+    parser.add_argument('--seed', type=int, default=1, help='draws the ids and search terms')
+    parser.add_argument('--cache', action='store_true', help='keep the view cache on')
+    parser.add_argument('--compare', nargs=2, metavar=('FIRST', 'SECOND'))
+    args = parser.parse_args()
+    if args.compare:
+        compare(*args.compare)
+    elif args.label:
+        if record(args.label, args.requests, args.warmup, args.seed, args.cache):
+            raise SystemExit(1)
+    else:
+        parser.error('--label or --compare is required')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,136 @@
+"""
+Record EXPLAIN plans and latencies of the hot queries, to compare a database
+before and after the index migration :
+
+    $ flask db upgrade 3f1c2a9d7b10
+    $ python -m benchmarks.explain_indexes --label before
+    $ flask db upgrade
+    $ python -m benchmarks.explain_indexes --label after
+    $ python -m benchmarks.explain_indexes --compare before after
+
+Results go to benchmarks/results/explain-<label>.json .
+"""
+import argparse
+import json
+import os
+import statistics
+import time
+from datetime import datetime, timedelta, timezone
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), 'results')
+
+
+def hot_queries(db, Venue, Artist, Show):
+    """ The statements behind the detail pages, /venues, /shows and its
+    windows, the show sweep and genre filtering, with the busiest venue / artist as sample . """
+    venue_id = db.session.query(Show.venue_id).group_by(Show.venue_id)\
+        .order_by(db.func.count().desc()).limit(1).scalar() or 1
+    artist_id = db.session.query(Show.artist_id).group_by(Show.artist_id)\
+        .order_by(db.func.count().desc()).limit(1).scalar() or 1
+    city, state = db.session.query(Venue.city, Venue.state)\
+        .order_by(Venue.city.desc(), Venue.state.desc()).first() or ('', '')
+    now = datetime.now(timezone.utc)
+    return {
+        'venue_detail': db.session.query(Venue, Artist.id, Artist.name, Artist.image_link, Show.start_time)
+            .outerjoin(Show, Show.venue_id == Venue.id)
+            .outerjoin(Artist, Artist.id == Show.artist_id)
+            .filter(Venue.id == venue_id).order_by(Show.start_time),
+        'artist_detail': db.session.query(Artist, Venue.id, Venue.name, Venue.image_link, Show.start_time)
+            .outerjoin(Show, Show.artist_id == Artist.id)
+            .outerjoin(Venue, Venue.id == Show.venue_id)
+            .filter(Artist.id == artist_id).order_by(Show.start_time),
+        'venue_upcoming_shows': db.session.query(Show.id)
+            .filter(Show.venue_id == venue_id, Show.start_time > now),
+        'venues_last_page': db.session.query(Venue.id, Venue.name, Venue.city, Venue.state)
+            .filter(db.tuple_(Venue.city, Venue.state, Venue.id) >= db.tuple_(city, state, 0))
+            .order_by(Venue.city, Venue.state, Venue.id).limit(50),
+        'venues_in_area': db.session.query(Venue.id)
+            .filter(Venue.city == city, Venue.state == state),
+        'shows_deep_page': db.session.query(Show.id, Show.start_time)
+            .filter(db.tuple_(Show.start_time, Show.id) > db.tuple_(now, 0))
+            .order_by(Show.start_time, Show.id).limit(50),
+        'shows_window': db.session.query(Show.id, Show.start_time)
+            .filter(Show.start_time >= now, Show.start_time < now + timedelta(days=3))
+            .filter(Show.venue_id.in_(db.select(Venue.id).where(db.func.lower(Venue.city) == city.lower())))
+            .order_by(Show.start_time, Show.id).limit(50),
+        'sweep_candidates': db.session.query(Show.id)
+            .filter(Show.is_upcoming, Show.start_time <= now),
+        'venues_by_genre': db.session.query(Venue.id)
+            .filter(Venue.genres.contains(['Jazz'])) if db.engine.dialect.name == 'postgresql'
+            else db.session.query(Venue.id).filter(Venue.genres.isnot(None)),
+    }
+
+
+def explain(db, query):
+    statement = query.statement.compile(db.engine, compile_kwargs={'literal_binds': True})
+    if db.engine.dialect.name == 'postgresql':
+        plan = db.session.execute(db.text(f'EXPLAIN (ANALYZE, FORMAT JSON) {statement}')).scalar()
+    else:
+        plan = [list(row) for row in db.session.execute(db.text(f'EXPLAIN QUERY PLAN {statement}'))]
+    return str(statement), plan
+
+
+def time_query(query, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        query.all()
+        timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    return {
+        'median_ms': round(statistics.median(timings), 3),
+        'p95_ms': round(timings[max(int(len(timings) * 0.95) - 1, 0)], 3),
+        'min_ms': round(timings[0], 3),
+    }
+
+
+def record(label, repeat):
+    from app import create_app
+    from models import db, Venue, Artist, Show
+    app = create_app()
+    results = {}
+    with app.app_context():
+        for name, query in hot_queries(db, Venue, Artist, Show).items():
+            sql, plan = explain(db, query)
+            results[name] = {'sql': sql, 'plan': plan, **time_query(query, repeat)}
+            print(f"{name:24} median {results[name]['median_ms']:9.3f} ms   "
+                  f"p95 {results[name]['p95_ms']:9.3f} ms")
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    path = os.path.join(RESULTS_DIR, f'explain-{label}.json')
+    with open(path, 'w') as output:
+        json.dump({'label': label, 'recorded_at': datetime.now().isoformat(),
+                   'repeat': repeat, 'queries': results}, output, indent=2, default=str)
+    print(f'Saved {path}')
+
+
+def compare(before, after):
+    runs = []
+    for label in (before, after):
+        with open(os.path.join(RESULTS_DIR, f'explain-{label}.json')) as result:
+            runs.append(json.load(result)['queries'])
+    print(f"{'query':24} {before:>12} {after:>12} {'speedup':>9}")
+    for name, first in runs[0].items():
+        second = runs[1].get(name)
+        if second is None:
+            continue
+        speedup = first['median_ms'] / second['median_ms'] if second['median_ms'] else float('inf')
+        print(f"{name:24} {first['median_ms']:10.3f}ms {second['median_ms']:10.3f}ms {speedup:8.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--label', help='name of this run, e.g. before / after')
+    parser.add_argument('--repeat', type=int, default=50)
+    parser.add_argument('--compare', nargs=2, metavar=('BEFORE', 'AFTER'))
+    args = parser.parse_args()
+    if args.compare:
+        compare(*args.compare)
+    elif args.label:
+        record(args.label, args.repeat)
+    else:
+        parser.error('--label or --compare is required')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,126 @@
+"""
+Load a running server with concurrent clients and record requests/sec and
+latency percentiles, to compare the sync ( WSGI ) and async ( ASGI ) modes :
+
+    $ flask run --port 5000 --with-threads
+    $ python -m benchmarks.loadtest http://localhost:5000 --label sync
+    $ uvicorn asgi:application --port 8000
+    $ python -m benchmarks.loadtest http://localhost:8000 --label async
+    $ python -m benchmarks.loadtest --compare sync async
+
+Run both against the same database and with the view cache off
+( CACHE_BACKEND=none ) or every request after the first is a cache hit .
+Results go to benchmarks/results/loadtest-<label>.json .
+"""
+import argparse
+import json
+import os
+import threading
+import time
+import urllib.error
+import urllib.request
+from datetime import datetime
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), 'results')
+
+DEFAULT_PATHS = ['/venues/1', '/artists/1']
+
+
+def percentile(timings, fraction):
+    return timings[min(int(len(timings) * fraction), len(timings) - 1)]
+
+
+def client(base_url, paths, deadline, timings, errors, lock):
+    """ One client sending requests back to back until deadline . """
+    turn = 0
+    while time.monotonic() < deadline:
+        url = base_url + paths[turn % len(paths)]
+        turn += 1
+        started = time.perf_counter()
+        try:
+            with urllib.request.urlopen(url, timeout=30) as response:
+                response.read()
+        except (urllib.error.URLError, OSError):
+            with lock:
+                errors[0] += 1
+            continue
+        elapsed = (time.perf_counter() - started) * 1000
+        with lock:
+            timings.append(elapsed)
+
+
+def run(base_url, paths, concurrency, duration, warmup):
+    for path in paths * warmup:
+        urllib.request.urlopen(base_url + path, timeout=30).read()
+    timings, errors, lock = [], [0], threading.Lock()
+    deadline = time.monotonic() + duration
+    clients = [threading.Thread(target=client, args=(base_url, paths, deadline, timings, errors, lock))
+               for _ in range(concurrency)]
+    started = time.perf_counter()
+    for thread in clients:
+        thread.start()
+    for thread in clients:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    timings.sort()
+    if not timings:
+        raise SystemExit(f'No request succeeded ({errors[0]} errors)')
+    return {
+        'requests': len(timings),
+        'errors': errors[0],
+        'requests_per_sec': round(len(timings) / elapsed, 1),
+        'p50_ms': round(percentile(timings, 0.50), 3),
+        'p95_ms': round(percentile(timings, 0.95), 3),
+        'p99_ms': round(percentile(timings, 0.99), 3),
+        'max_ms': round(timings[-1], 3),
+    }
+
+
+def record(label, base_url, paths, concurrency, duration, warmup):
+    result = run(base_url.rstrip('/'), paths, concurrency, duration, warmup)
+    print(f"{result['requests_per_sec']:.1f} req/s   p50 {result['p50_ms']:.1f} ms   "
+          f"p99 {result['p99_ms']:.1f} ms   {result['errors']} errors")
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    path = os.path.join(RESULTS_DIR, f'loadtest-{label}.json')
+    with open(path, 'w') as output:
+        json.dump({'label': label, 'recorded_at': datetime.now().isoformat(), 'url': base_url,
+                   'paths': paths, 'concurrency': concurrency, 'duration': duration,
+                   **result}, output, indent=2)
+    print(f'Saved {path}')
+
+
+def compare(first, second):
+    runs = []
+    for label in (first, second):
+        with open(os.path.join(RESULTS_DIR, f'loadtest-{label}.json')) as result:
+            runs.append(json.load(result))
+    print(f"{'':18} {first:>12} {second:>12} {'ratio':>9}")
+    for metric in ('requests_per_sec', 'p50_ms', 'p95_ms', 'p99_ms', 'errors'):
+        a, b = runs[0][metric], runs[1][metric]
+        ratio = f'{b / a:8.2f}x' if a else f"{'-':>9}"
+        print(f"{metric:18} {a:12} {b:12} {ratio}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('url', nargs='?', help='base url of the running server')
+    parser.add_argument('--label', help='name of this run, e.g. sync / async')
+    parser.add_argument('--path', action='append', dest='paths',
+                        help=f'path to request, repeatable (default {" ".join(DEFAULT_PATHS)})')
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--duration', type=float, default=20, help='seconds')
+    parser.add_argument('--warmup', type=int, default=5, help='requests per path before timing')
+    parser.add_argument('--compare', nargs=2, metavar=('FIRST', 'SECOND'))
+    args = parser.parse_args()
+    if args.compare:
+        compare(*args.compare)
+    elif args.url and args.label:
+        record(args.label, args.url, args.paths or DEFAULT_PATHS, args.concurrency,
+               args.duration, args.warmup)
+    else:
+        parser.error('url and --label, or --compare, are required')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+"""
+Measure cold start : importing app.py, create_app() and the first response,
+each run in a fresh interpreter so nothing is already imported :
+
+    $ python -m benchmarks.startup --label before
+    $ python -m benchmarks.startup --label after --path /api/v1/venues
+    $ python -m benchmarks.startup --compare before after
+
+The first response goes through the test client, the database has to be
+reachable for paths that query it . Results go to
+benchmarks/results/startup-<label>.json .
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from datetime import datetime
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), 'results')
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules worth knowing about when they are loaded without being needed .
+HEAVY_MODULES = ('forms', 'wtforms', 'babel.dates', 'dateutil.parser')
+
+PROBE = '''
+import json, sys, time
+started = time.perf_counter()
+import app
+imported = time.perf_counter()
+flask_app = app.create_app()
+created = time.perf_counter()
+status = flask_app.test_client().get(sys.argv[1]).status_code
+responded = time.perf_counter()
+print(json.dumps({
+    'import_ms': (imported - started) * 1000,
+    'create_ms': (created - imported) * 1000,
+    'first_response_ms': (responded - created) * 1000,
+    'status': status,
+    'modules': len(sys.modules),
+    'heavy_modules': [name for name in %r if name in sys.modules],
+}))
+''' % (HEAVY_MODULES,)
+
+
+def probe(path):
+    output = subprocess.run([sys.executable, '-c', PROBE, path], cwd=ROOT, check=True,
+                            capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def run(path, repeat):
+    runs = [probe(path) for _ in range(repeat)]
+    result = {metric: round(statistics.median(run[metric] for run in runs), 3)
+              for metric in ('import_ms', 'create_ms', 'first_response_ms')}
+    result['total_ms'] = round(result['import_ms'] + result['create_ms']
+                               + result['first_response_ms'], 3)
+    result.update(status=runs[-1]['status'], modules=runs[-1]['modules'],
+                  heavy_modules=runs[-1]['heavy_modules'])
+    return result
+
+
+def record(label, path, repeat):
+    result = run(path, repeat)
+    print(f"import {result['import_ms']:.1f} ms   create_app {result['create_ms']:.1f} ms   "
+          f"first response {result['first_response_ms']:.1f} ms ({result['status']})   "
+          f"{result['modules']} modules")
+    print(f"loaded heavy modules: {', '.join(result['heavy_modules']) or 'none'}")
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    output_path = os.path.join(RESULTS_DIR, f'startup-{label}.json')
+    with open(output_path, 'w') as output:
+        json.dump({'label': label, 'recorded_at': datetime.now().isoformat(), 'path': path,
+                   'repeat': repeat, **result}, output, indent=2)
+    print(f'Saved {output_path}')
+
+
+def compare(before, after):
+    runs = []
+    for label in (before, after):
+        with open(os.path.join(RESULTS_DIR, f'startup-{label}.json')) as result:
+            runs.append(json.load(result))
+    print(f"{'':18} {before:>12} {after:>12} {'speedup':>9}")
+    for metric in ('import_ms', 'create_ms', 'first_response_ms', 'total_ms', 'modules'):
+        first, second = runs[0][metric], runs[1][metric]
+        speedup = f'{first / second:8.2f}x' if second else f"{'-':>9}"
+        print(f"{metric:18} {first:12} {second:12} {speedup}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--label', help='name of this run, e.g. before / after')
+    parser.add_argument('--path', default='/', help='path of the first request')
+    parser.add_argument('--repeat', type=int, default=10)
+    parser.add_argument('--compare', nargs=2, metavar=('BEFORE', 'AFTER'))
+    args = parser.parse_args()
+    if args.compare:
+        compare(*args.compare)
+    elif args.label:
+        record(args.label, args.path, args.repeat)
+    else:
+        parser.error('--label or --compare is required')
+
+
+if __name__ == '__main__':
+    main()
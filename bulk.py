@@ -0,0 +1,226 @@
+import csv
+import io
+import json
+import os
+import time
+import zlib
+from itertools import islice
+
+from werkzeug.datastructures import MultiDict
+
+#----------------------------------------------------------------------------#
+# Bulk import .
+# Rows are streamed from a CSV / NDJSON file, validated with the same WTForms
+# as the create pages and written in batches, one transaction per batch . A
+# checkpoint file next to the input records the last committed line so a
+# failed run can pick up where it stopped .
+#----------------------------------------------------------------------------#
+
+
+def detect_format(path, fmt=None):
+    if fmt:
+        return fmt
+    return 'ndjson' if path.endswith(('.ndjson', '.jsonl', '.json')) else 'csv'
+
+
+def read_rows(path, fmt=None):
+    """ Yield (line number, row dict) from a CSV or NDJSON file . """
+    with open(path, newline='', encoding='utf-8') as source:
+        if detect_format(path, fmt) == 'ndjson':
+            for line_no, line in enumerate(source, start=1):
+                if line.strip():
+                    yield line_no, json.loads(line)
+        else:
+            # Header is line 1, the first row is line 2 .
+            for line_no, row in enumerate(csv.DictReader(source), start=2):
+                yield line_no, row
+
+
+def batched(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def form_data(row, aliases):
+    """ Row as the MultiDict a form post would send, aliases maps a column
+    name to its form field name ( seeking_talent -> talent ) . """
+    data = MultiDict()
+    for key, value in row.items():
+        key = aliases.get(key, key)
+        if value is None:
+            continue
+        if key == 'genres':
+            values = value if isinstance(value, list) else value.split(';')
+            for genre in values:
+                if genre.strip():
+                    data.add(key, genre.strip())
+        elif isinstance(value, bool) or key == 'talent':
+            # BooleanField only treats '' and 'false' as false .
+            if value is True or str(value).lower() in ('true', 'y', 'yes', '1'):
+                data.add(key, 'y')
+        else:
+            data.add(key, str(value))
+    return data
+
+
+def validate_row(form_class, row, aliases):
+    """ Return (form, errors) for a row, the form has no CSRF token since
+    there is no request . """
+    form = form_class(formdata=form_data(row, aliases), meta={'csrf': False})
+    if form.validate():
+        return form, None
+    return form, form.errors
+
+
+class Checkpoint:
+    """ Last committed line of an import, kept in <input>.checkpoint . """
+
+    def __init__(self, path):
+        self.path = path + '.checkpoint'
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return 0
+        with open(self.path) as checkpoint:
+            return json.load(checkpoint)['line']
+
+    def save(self, line_no):
+        with open(self.path + '.tmp', 'w') as checkpoint:
+            json.dump({'line': line_no}, checkpoint)
+        os.replace(self.path + '.tmp', self.path)
+
+    def clear(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+class ImportReport:
+    def __init__(self, echo):
+        self.echo = echo
+        self.started = time.perf_counter()
+        self.imported = 0
+        self.rejected = 0
+        self.skipped = 0
+
+    def rate(self):
+        elapsed = time.perf_counter() - self.started
+        return self.imported / elapsed if elapsed else 0.0
+
+    def batch_done(self, line_no):
+        self.echo(f'line {line_no}: {self.imported} rows imported, '
+                  f'{self.rejected} rejected ({self.rate():.0f} rows/sec)')
+
+    def summary(self):
+        elapsed = time.perf_counter() - self.started
+        self.echo(f'Imported {self.imported} rows in {elapsed:.1f}s '
+                  f'({self.rate():.0f} rows/sec), {self.rejected} rejected, '
+                  f'{self.skipped} skipped from a previous run')
+
+
+def import_rows(session, path, to_record, write_batch, echo, fmt=None,
+                batch_size=1000, resume=True):
+    """ Stream path into the database .
+
+    to_record(row) returns (record dict, None) or (None, errors) .
+    write_batch(records) inserts a batch, it runs inside the batch
+    transaction and may return rejected (record, reason) pairs . Rejected
+    rows go to <path>.rejects.ndjson . """
+    checkpoint = Checkpoint(path)
+    start_after = checkpoint.load() if resume else 0
+    report = ImportReport(echo)
+    if start_after:
+        echo(f'Resuming after line {start_after}')
+    with open(path + '.rejects.ndjson', 'a' if start_after else 'w') as rejects:
+        def reject(line_no, row, errors):
+            report.rejected += 1
+            rejects.write(json.dumps({'line': line_no, 'row': row, 'errors': errors},
+                                     default=str) + '\n')
+
+        for batch in batched(read_rows(path, fmt), batch_size):
+            last_line = batch[-1][0]
+            if last_line <= start_after:
+                report.skipped += len(batch)
+                continue
+            records = []
+            for line_no, row in batch:
+                if line_no <= start_after:
+                    report.skipped += 1
+                    continue
+                record, errors = to_record(row)
+                if errors:
+                    reject(line_no, row, errors)
+                else:
+                    records.append((line_no, row, record))
+            try:
+                rejected = []
+                if records:
+                    rejected = write_batch([record for _, _, record in records]) or []
+                session.commit()
+            except Exception:
+                session.rollback()
+                echo(f'Batch ending at line {last_line} failed, '
+                     f'run again to resume after line {checkpoint.load()}')
+                raise
+            rejected_ids = {id(record): reason for record, reason in rejected}
+            for line_no, row, record in records:
+                if id(record) in rejected_ids:
+                    reject(line_no, row, rejected_ids[id(record)])
+                else:
+                    report.imported += 1
+            checkpoint.save(last_line)
+            report.batch_done(last_line)
+    checkpoint.clear()
+    report.summary()
+    return report
+
+
+#----------------------------------------------------------------------------#
+# Bulk export .
+# Rows come from a server-side cursor and are turned into text chunks as they
+# arrive, memory stays flat whatever the size of the table .
+#----------------------------------------------------------------------------#
+
+EXPORT_MIMETYPES = {'ndjson': 'application/x-ndjson', 'csv': 'text/csv'}
+
+
+def export_value(value):
+    if isinstance(value, list):
+        return ';'.join(value)
+    return value
+
+
+def export_chunks(rows, fields, fmt, rows_per_chunk=500):
+    """ Yield the rows as NDJSON or CSV text, a few hundred rows per chunk .
+    Values are written the way the import command reads them back . """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if fmt == 'csv':
+        writer.writerow(fields)
+    count = 0
+    for row in rows:
+        if fmt == 'csv':
+            writer.writerow([export_value(getattr(row, field)) for field in fields])
+        else:
+            buffer.write(json.dumps({field: getattr(row, field) for field in fields},
+                                    default=str) + '\n')
+        count += 1
+        if count % rows_per_chunk == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def gzip_chunks(chunks):
+    """ gzip a stream of text chunks without holding it all in memory . """
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode('utf-8'))
+        if data:
+            yield data
+    yield compressor.flush()
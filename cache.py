@@ -0,0 +1,146 @@
+import hashlib
+import pickle
+import threading
+import time
+from collections import OrderedDict
+
+#----------------------------------------------------------------------------#
+# View cache .
+# Cached values live under a namespace ( 'venue:1', 'venues', ... ) and every
+# key carries the namespace version, invalidating a namespace only bumps its
+# version so old entries are never served again and age out on their own .
+# Invalidation only reaches the process that wrote, so the views also put the
+# database versions behind their ETag in the key : another worker's write or a
+# show starting changes the key even while the old entry is still cached .
+#----------------------------------------------------------------------------#
+
+MISSING = object()
+
+
+class LRUCache:
+    """ In-process LRU with a TTL and a size bound . Namespace versions are
+    kept apart so evicting an entry can never bring back an old version . """
+
+    def __init__(self, maxsize=1024, ttl=60):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.versions = {}
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return MISSING
+            value, expires = entry
+            if expires < time.monotonic():
+                del self.entries[key]
+                return MISSING
+            self.entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self.lock:
+            self.entries[key] = (value, time.monotonic() + self.ttl)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+    def version(self, namespace):
+        return self.versions.get(namespace, 0)
+
+    def bump(self, namespace):
+        with self.lock:
+            self.versions[namespace] = self.versions.get(namespace, 0) + 1
+
+
+class RedisCache:
+    """ Shared backend so every worker sees the same entries and versions,
+    needs the redis package . """
+
+    def __init__(self, url, ttl=60, prefix='fyyur:'):
+        import redis
+        self.client = redis.Redis.from_url(url)
+        self.ttl = ttl
+        self.prefix = prefix
+
+    def get(self, key):
+        raw = self.client.get(self.prefix + key)
+        return MISSING if raw is None else pickle.loads(raw)
+
+    def set(self, key, value):
+        self.client.setex(self.prefix + key, self.ttl, pickle.dumps(value))
+
+    def version(self, namespace):
+        return int(self.client.get(self.prefix + 'version:' + namespace) or 0)
+
+    def bump(self, namespace):
+        self.client.incr(self.prefix + 'version:' + namespace)
+
+
+class NullCache:
+    def get(self, key):
+        return MISSING
+
+    def set(self, key, value):
+        pass
+
+    def version(self, namespace):
+        return 0
+
+    def bump(self, namespace):
+        pass
+
+
+class ViewCache:
+    """ Front of the backends used by the views . """
+
+    # Bumped by clear(), part of every key .
+    GLOBAL = '*'
+
+    def __init__(self, backend):
+        self.backend = backend
+
+    def key(self, namespace, parts):
+        return ':'.join([namespace, str(self.backend.version(self.GLOBAL)),
+                         str(self.backend.version(namespace))] + [str(part) for part in parts])
+
+    def get_or_set(self, namespace, parts, build):
+        key = self.key(namespace, parts)
+        value = self.backend.get(key)
+        if value is MISSING:
+            value = build()
+            self.backend.set(key, value)
+        return value
+
+    async def get_or_set_async(self, namespace, parts, build):
+        """ get_or_set for a coroutine function build . """
+        key = self.key(namespace, parts)
+        value = self.backend.get(key)
+        if value is MISSING:
+            value = await build()
+            self.backend.set(key, value)
+        return value
+
+    def invalidate(self, *namespaces):
+        for namespace in set(namespaces):
+            self.backend.bump(namespace)
+
+    def clear(self):
+        self.backend.bump(self.GLOBAL)
+
+
+def make_cache(config):
+    backend = config.get('CACHE_BACKEND', 'memory')
+    if backend == 'redis':
+        return ViewCache(RedisCache(config['CACHE_URL'], ttl=config.get('CACHE_TTL', 60)))
+    if backend == 'memory':
+        return ViewCache(LRUCache(maxsize=config.get('CACHE_MAXSIZE', 1024),
+                                  ttl=config.get('CACHE_TTL', 60)))
+    return ViewCache(NullCache())
+
+
+def make_etag(*parts):
+    """ Strong ETag out of whatever versions a page depends on . """
+    return hashlib.sha1(repr(parts).encode()).hexdigest()
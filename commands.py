@@ -0,0 +1,279 @@
+import sys
+from datetime import datetime, timezone
+
+import click
+from flask import Blueprint, current_app
+
+from api import EXPORTS, export_rows
+from bulk import EXPORT_MIMETYPES, export_chunks, gzip_chunks, import_rows, read_rows, validate_row
+from conflicts import ConflictChecker, booking_end, describe
+from dates import localize
+from fragments import compile_templates
+from geners import normalize_genres
+from models import db, Artist, ArtistGenre, Show, Venue, VenueGenre
+from pages import (live, rebuild_upcoming_shows, release_upcoming_shows, searcher, tombstoned,
+                   view_cache)
+
+#----------------------------------------------------------------------------#
+# Commands.
+# Registered as top level flask commands ( flask sweep-shows, flask import ... ) .
+#----------------------------------------------------------------------------#
+
+cli = Blueprint('commands', __name__, cli_group=None)
+
+
+@cli.cli.command('sweep-shows')
+@click.option('--rebuild', is_flag=True, help='Recount every show from scratch.')
+def sweep_shows(rebuild):
+    """ Move shows that have now passed out of the upcoming counters,
+    run it periodically (e.g. from a scheduler) . """
+    if rebuild:
+        rebuild_upcoming_shows()
+        db.session.commit()
+        view_cache.clear()
+        click.echo('Upcoming show counters rebuilt')
+        return
+    released = release_upcoming_shows(Show.start_time <= datetime.now(timezone.utc))
+    db.session.commit()
+    view_cache.clear()
+    click.echo(f'{released} shows moved to past')
+
+
+@cli.cli.command('purge-deleted')
+@click.option('--batch-size', default=5000, show_default=True,
+              help='Shows removed per transaction.')
+def purge_deleted(batch_size):
+    """ Remove deleted venues and artists for good, run it periodically .
+    Their shows go first, batch_size at a time with a commit after each
+    batch, so no transaction holds many show rows at once ; upcoming ones
+    are taken out of the other side's counters on the way . """
+    for model, foreign_key in ((Venue, Show.venue_id), (Artist, Show.artist_id)):
+        shows = 0
+        while True:
+            batch = db.session.scalars(db.select(Show.id).where(foreign_key.in_(tombstoned(model)))
+                                       .limit(batch_size)).all()
+            if batch:
+                release_upcoming_shows(Show.id.in_(batch))
+                db.session.execute(db.delete(Show).where(Show.id.in_(batch)))
+                db.session.commit()
+            shows += len(batch)
+            if len(batch) < batch_size:
+                break
+        link_model, owner_key = GENRE_LINKS[model]
+        db.session.execute(db.delete(link_model).where(
+            getattr(link_model, owner_key).in_(tombstoned(model))))
+        removed = db.session.execute(db.delete(model).where(model.deleted_at.isnot(None))).rowcount
+        db.session.commit()
+        click.echo(f'{removed} {model.__tablename__} rows and {shows} of their shows purged')
+    view_cache.clear()
+
+
+# Bulk import .
+
+IMPORTS = {
+    # kind: (model, form name in forms.py, column name -> form field name)
+    'venues': (Venue, 'VenueForm', {'seeking_talent': 'talent', 'seeking_description': 'description'}),
+    'artists': (Artist, 'ArtistForm', {'seeking_venue': 'talent', 'seeking_description': 'description'}),
+    'shows': (Show, 'ShowForm', {}),
+}
+
+# Genre index rows written next to imported venues / artists .
+GENRE_LINKS = {Venue: (VenueGenre, 'venue_id'), Artist: (ArtistGenre, 'artist_id')}
+
+
+def import_record(kind, row):
+    """ Validate a row with the create form of kind, return (record, errors) . """
+    import forms
+    model, form_name, aliases = IMPORTS[kind]
+    form, errors = validate_row(getattr(forms, form_name), row, aliases)
+    if errors:
+        return None, errors
+    columns = {field: column for column, field in aliases.items()}
+    record = {columns.get(name, name): field.data
+              for name, field in form._fields.items() if name != 'csrf_token'}
+    if 'genres' in record:
+        record['genres'] = normalize_genres(record['genres'])
+    # Exported rows keep their id, so imported shows still point at their
+    # venue / artist .
+    if row.get('id') not in (None, ''):
+        try:
+            record['id'] = int(row['id'])
+        except (TypeError, ValueError):
+            return None, {'id': ['Not a valid id.']}
+    if kind == 'shows':
+        # ShowForm would fall back to its default start_time .
+        if not row.get('start_time'):
+            return None, {'start_time': ['This field is required.']}
+        try:
+            record['venue_id'] = int(record['venue_id'])
+            record['artist_id'] = int(record['artist_id'])
+        except (TypeError, ValueError):
+            return None, {'venue_id/artist_id': ['Not a valid id.']}
+    return record, None
+
+
+def sync_id_sequence(model):
+    """ Move the id sequence of model past the ids an import wrote, Postgres
+    only, other databases take the next id from the table . """
+    if db.engine.dialect.name == 'postgresql':
+        table = model.__tablename__
+        db.session.execute(db.text(
+            f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+            f"(SELECT coalesce(max(id), 0) + 1 FROM {table}), false)"))
+        db.session.commit()
+
+
+def write_entities(model, records):
+    """ Insert a batch of venues / artists and their genre index rows, the
+    core insert skips validate_genres so the links are written here . """
+    ids = db.session.scalars(
+        db.insert(model).returning(model.id, sort_by_parameter_order=True), records).all()
+    link_model, owner_key = GENRE_LINKS[model]
+    links = [{'genre': genre, owner_key: entity_id}
+             for entity_id, record in zip(ids, records) for genre in record['genres']]
+    if links:
+        db.session.execute(db.insert(link_model), links)
+
+
+def prepare_shows(records):
+    """ Split proposed shows into (accepted, rejected (record, errors)) in
+    one pass : the venue and artist have to exist and be free for the whole
+    show, against the database and the other records . Times of accepted
+    records are resolved to UTC and they get an end_time . Times without an
+    offset are wall clock times at the venue . """
+    timezones = dict(db.session.query(Venue.id, Venue.timezone)
+                     .filter(Venue.id.in_({record['venue_id'] for record in records}), *live(Venue)))
+    artist_ids = {id_ for id_, in db.session.query(Artist.id)
+                  .filter(Artist.id.in_({record['artist_id'] for record in records}), *live(Artist))}
+    candidates, rejected = [], []
+    for record in records:
+        if record['venue_id'] not in timezones or record['artist_id'] not in artist_ids:
+            rejected.append((record, {'venue_id/artist_id': ['No such venue or artist.']}))
+            continue
+        tz = timezones[record['venue_id']]
+        end_time, duration = record.pop('end_time', None), record.pop('duration', None)
+        record['start_time'] = localize(record['start_time'], tz).astimezone(timezone.utc)
+        record['end_time'] = booking_end(record['start_time'], duration,
+                                         end_time and localize(end_time, tz))
+        if record['end_time'] <= record['start_time']:
+            rejected.append((record, {'end_time': ['Has to be after start_time.']}))
+            continue
+        candidates.append(record)
+    checker = ConflictChecker().load(db.session, Show, candidates, *live(Show))
+    accepted = []
+    for record in candidates:
+        conflicts = checker.book(record, 'another show of this import')
+        if conflicts:
+            rejected.append((record, {'start_time': describe(conflicts)}))
+        else:
+            accepted.append(record)
+    return accepted, rejected
+
+
+def write_shows(records):
+    """ Insert the bookable shows of a batch, and add the upcoming ones to
+    the counters with one executemany per table . """
+    accepted, rejected = prepare_shows(records)
+    now = datetime.now(timezone.utc)
+    upcoming = {Venue: {}, Artist: {}}
+    for record in accepted:
+        record['is_upcoming'] = record['start_time'] > now
+        if record['is_upcoming']:
+            for model, key in ((Venue, 'venue_id'), (Artist, 'artist_id')):
+                upcoming[model][record[key]] = upcoming[model].get(record[key], 0) + 1
+    if accepted:
+        db.session.execute(db.insert(Show), accepted)
+    for model, counts in upcoming.items():
+        if counts:
+            db.session.execute(
+                db.update(model.__table__)
+                .where(model.__table__.c.id == db.bindparam('entity_id'))
+                .values(upcoming_shows_count=model.__table__.c.upcoming_shows_count + db.bindparam('count')),
+                [{'entity_id': entity_id, 'count': count} for entity_id, count in counts.items()])
+    return rejected
+
+
+@cli.cli.command('import')
+@click.argument('kind', type=click.Choice(sorted(IMPORTS)))
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--format', 'fmt', type=click.Choice(['csv', 'ndjson']),
+              help='Defaults to the file extension.')
+@click.option('--batch-size', default=1000, show_default=True)
+@click.option('--resume/--restart', default=True, show_default=True,
+              help='Continue after the last committed batch of a failed run.')
+def import_data(kind, path, fmt, batch_size, resume):
+    """ Stream venues, artists or shows from a CSV / NDJSON file . Genres are
+    a list in NDJSON and separated by ';' in CSV . Rows with an id keep it,
+    upcoming_shows_count is not read : the counters are kept from the
+    imported shows . """
+    model = IMPORTS[kind][0]
+    if kind == 'shows':
+        write_batch = write_shows
+    else:
+        def write_batch(records):
+            write_entities(model, records)
+    import_rows(db.session, path, lambda row: import_record(kind, row), write_batch,
+                click.echo, fmt=fmt, batch_size=batch_size, resume=resume)
+    sync_id_sequence(model)
+    searcher(model).reset()
+    view_cache.clear()
+
+
+@cli.cli.command('check-shows')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--format', 'fmt', type=click.Choice(['csv', 'ndjson']),
+              help='Defaults to the file extension.')
+def check_shows(path, fmt):
+    """ Validate a file of proposed shows without writing anything : form
+    errors, unknown venues / artists and double bookings, against the
+    database and within the file . Exits with 1 when a show is rejected . """
+    records, lines, rejected = [], {}, []
+    for line_no, row in read_rows(path, fmt):
+        record, errors = import_record('shows', row)
+        if errors:
+            rejected.append((line_no, errors))
+        else:
+            records.append(record)
+            lines[id(record)] = line_no
+    accepted, conflicts = prepare_shows(records)
+    rejected += [(lines[id(record)], errors) for record, errors in conflicts]
+    for line_no, errors in sorted(rejected, key=lambda item: item[0]):
+        click.echo(f'line {line_no}: {errors}')
+    click.echo(f'{len(accepted)} shows can be booked, {len(rejected)} rejected')
+    db.session.rollback()
+    if rejected:
+        sys.exit(1)
+
+
+@cli.cli.command('compile-templates')
+def compile_templates_command():
+    """ Compile every template into the bytecode cache ( JINJA_BYTECODE_CACHE ),
+    run at deploy so workers load them instead of parsing them . """
+    env = current_app.jinja_env
+    if env.bytecode_cache is None:
+        raise click.ClickException('JINJA_BYTECODE_CACHE is not set')
+    click.echo(f'{compile_templates(env)} templates compiled into {current_app.config["JINJA_BYTECODE_CACHE"]}')
+
+
+@cli.cli.command('export')
+@click.argument('kind', type=click.Choice(sorted(EXPORTS)))
+@click.option('--format', 'fmt', type=click.Choice(sorted(EXPORT_MIMETYPES)),
+              default='ndjson', show_default=True)
+@click.option('--gzip', 'compress', is_flag=True, help='gzip the output.')
+@click.option('-o', '--output', type=click.Path(dir_okay=False), help='Defaults to stdout.')
+def export_data(kind, fmt, compress, output):
+    """ Stream every venue, artist or show as NDJSON / CSV . Imported into
+    an empty database in that order, venues, artists then shows, the
+    output gives the same export back . """
+    chunks = export_chunks(export_rows(kind), EXPORTS[kind][1], fmt)
+    target = open(output, 'wb') if output else sys.stdout.buffer
+    try:
+        if compress:
+            for chunk in gzip_chunks(chunks):
+                target.write(chunk)
+        else:
+            for chunk in chunks:
+                target.write(chunk.encode('utf-8'))
+    finally:
+        if output:
+            target.close()
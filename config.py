@@ -1,13 +1,101 @@
 import os
-SECRET_KEY = os.urandom(32)
+
+from sqlalchemy.pool import StaticPool
+
+# Shared by every worker so sessions and flashes survive a restart and any
+# worker can read them, a random key is only good for a single process.
+SECRET_KEY = os.environ.get('SECRET_KEY') or os.urandom(32)
 # Grabs the folder where the script runs.
 basedir = os.path.abspath(os.path.dirname(__file__))
 
-# Enable debug mode.
-DEBUG = True
+# Enable debug mode with FLASK_DEBUG=1, never in production.
+DEBUG = os.environ.get('FLASK_DEBUG', '0').lower() in ('1', 'true', 'yes')
 
 # Connect to the database
+# DATABASE_URL may use the postgres:// scheme, SQLAlchemy only knows postgresql://.
+SQLALCHEMY_DATABASE_URI = os.environ.get(
+    'DATABASE_URL', 'postgresql://abdulrahman@localhost:5432/fyyurapp'
+).replace('postgres://', 'postgresql://', 1)
+
+# Connection pool, per worker process. Workers x (DB_POOL_SIZE + DB_MAX_OVERFLOW)
+# has to stay under the server max_connections. Connections are recycled before
+# the server or a proxy drops them and checked with a ping before each checkout.
+# Statements running longer than DB_STATEMENT_TIMEOUT ( ms, 0 is no limit ) are cancelled.
+DB_STATEMENT_TIMEOUT = int(os.environ.get('DB_STATEMENT_TIMEOUT', 30000))
+SQLALCHEMY_ENGINE_OPTIONS = {
+    'pool_size': int(os.environ.get('DB_POOL_SIZE', 5)),
+    'max_overflow': int(os.environ.get('DB_MAX_OVERFLOW', 10)),
+    'pool_timeout': int(os.environ.get('DB_POOL_TIMEOUT', 30)),
+    'pool_recycle': int(os.environ.get('DB_POOL_RECYCLE', 1800)),
+    'pool_pre_ping': os.environ.get('DB_POOL_PRE_PING', 'true').lower() in ('1', 'true', 'yes'),
+    'connect_args': {
+        'options': '-c statement_timeout=%d' % DB_STATEMENT_TIMEOUT,
+    },
+}
+
+# Async engine of the ASGI mode ( asgi.py ), same pool settings on the asyncpg driver.
+ASYNC_ENGINE_OPTIONS = {
+    **{key: value for key, value in SQLALCHEMY_ENGINE_OPTIONS.items() if key != 'connect_args'},
+    'connect_args': {'server_settings': {'statement_timeout': str(DB_STATEMENT_TIMEOUT)}},
+}
+
+# SQLite for local runs without a Postgres server: DATABASE_URL=sqlite:// ( in memory,
+# a new database per process ) or sqlite:///fyyur.db. Genres are stored as JSON, the
+# Postgres-only constraints and indexes are skipped and search uses the in-process index.
+# The tables are created at startup ( DB_CREATE_ALL ), migrations are Postgres only.
+SQLITE = SQLALCHEMY_DATABASE_URI.startswith('sqlite')
+if SQLITE:
+    # Threads share the connections, an in-memory database lives as long as its
+    # only connection so the pool keeps exactly one.
+    SQLALCHEMY_ENGINE_OPTIONS = {'connect_args': {'check_same_thread': False}}
+    if SQLALCHEMY_DATABASE_URI in ('sqlite://', 'sqlite:///:memory:'):
+        SQLALCHEMY_ENGINE_OPTIONS['poolclass'] = StaticPool
+    ASYNC_ENGINE_OPTIONS = {}
+DB_CREATE_ALL = os.environ.get('DB_CREATE_ALL', str(SQLITE)).lower() in ('1', 'true', 'yes')
+
+# Read replicas, comma separated urls. GET requests read from them in turn; writes,
+# and requests of a browser in the REPLICA_STICKY seconds after it wrote, use the
+# primary. A replica that fails to connect is skipped for REPLICA_RETRY seconds.
+SQLALCHEMY_REPLICA_URIS = [uri.strip() for uri in os.environ.get('DATABASE_REPLICA_URLS', '').split(',')
+                           if uri.strip()]
+REPLICA_STICKY = int(os.environ.get('REPLICA_STICKY', 5))
+REPLICA_RETRY = int(os.environ.get('REPLICA_RETRY', 30))
+
+# Search backend, 'postgres' (full-text index) or 'memory' (in-process index).
+# Left empty it is picked from the database dialect.
+SEARCH_BACKEND = os.environ.get('SEARCH_BACKEND', '')
+SEARCH_PAGE_SIZE = 20
+
+# Listing pages ( /venues, /artists, /shows ), ?per_page= is capped by MAX_PAGE_SIZE.
+PAGE_SIZE = int(os.environ.get('PAGE_SIZE', 50))
+MAX_PAGE_SIZE = 200
+
+# Locale of the dates on the pages ( the `datetime` template filter ).
+DATE_LOCALE = os.environ.get('DATE_LOCALE', 'en_US')
+
+# Rendered show / venue / artist tiles of the list pages, kept per process and keyed by
+# the updated_at of the rows they show ( fragments.py ). 0 turns it off.
+FRAGMENT_CACHE_SIZE = int(os.environ.get('FRAGMENT_CACHE_SIZE', 10000))
+# Compiled templates, written by `flask compile-templates` at deploy and read at startup.
+# Empty keeps them in memory only.
+JINJA_BYTECODE_CACHE = os.environ.get('JINJA_BYTECODE_CACHE', os.path.join(basedir, '.jinja_cache'))
+
+# View cache, 'memory' ( per process LRU ), 'redis' ( shared, needs CACHE_URL ) or 'none'.
+CACHE_BACKEND = os.environ.get('CACHE_BACKEND', 'memory')
+CACHE_URL = os.environ.get('CACHE_URL', 'redis://localhost:6379/0')
+CACHE_MAXSIZE = 1024
+CACHE_TTL = int(os.environ.get('CACHE_TTL', 60))
+
+# Request instrumentation, off unless INSTRUMENTATION=1 : Server-Timing headers, a JSON
+# log line per request and /metrics. A statement run N_PLUS_ONE_THRESHOLD times in one
+# request is logged as an N+1, the log line lists the SLOWEST_STATEMENTS slowest ones.
+INSTRUMENTATION = os.environ.get('INSTRUMENTATION', '0').lower() in ('1', 'true', 'yes')
+N_PLUS_ONE_THRESHOLD = int(os.environ.get('N_PLUS_ONE_THRESHOLD', 5))
+SLOWEST_STATEMENTS = 3
 
+# JSON API responses bigger than this ( bytes ) are gzipped for clients that accept it.
+API_GZIP_MIN_SIZE = 1024
 
-# TODO IMPLEMENT DATABASE URL
-SQLALCHEMY_DATABASE_URI = 'postgres://abdulrahman@localhost:5432/fyyurapp'
+# /export/<kind> answers only requests sending 'Authorization: Bearer <EXPORT_TOKEN>'.
+EXPORT_TOKEN = os.environ.get('EXPORT_TOKEN')
+EXPORT_BATCH_SIZE = 1000
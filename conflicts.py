@@ -0,0 +1,154 @@
+import random
+from collections import namedtuple
+from datetime import timedelta, timezone
+
+#----------------------------------------------------------------------------#
+# Booking conflicts .
+# A venue and an artist can only have one show at a time : shows are
+# [start_time, end_time) intervals that must not overlap per venue and per
+# artist . On Postgres the show table has exclusion constraints for it, this
+# checks proposed shows before they are written, a whole batch in one pass :
+# the booked shows of the batch's venues / artists are loaded with one query
+# per side, every proposed show is then an O(log n) interval tree lookup .
+#----------------------------------------------------------------------------#
+
+# Length of a show when the booking doesn't say .
+DEFAULT_SHOW_MINUTES = 120
+
+Conflict = namedtuple('Conflict', ['side', 'other'])
+
+
+class Interval:
+    """ Node of a Schedule : a treap keyed on start ( heap ordered on a
+    random priority, which keeps it balanced whatever the insertion order ),
+    reach is the latest end in the subtree . """
+    __slots__ = ('start', 'end', 'label', 'priority', 'reach', 'left', 'right')
+
+    def __init__(self, start, end, label):
+        self.start = start
+        self.end = end
+        self.label = label
+        self.priority = random.random()
+        self.reach = end
+        self.left = self.right = None
+
+    def update(self):
+        self.reach = self.end
+        for child in (self.left, self.right):
+            if child is not None and child.reach > self.reach:
+                self.reach = child.reach
+
+
+def rotate(node, side):
+    """ Lift the child of node on side above it, returns the new root . """
+    other = 'right' if side == 'left' else 'left'
+    child = getattr(node, side)
+    setattr(node, side, getattr(child, other))
+    setattr(child, other, node)
+    node.update()
+    child.update()
+    return child
+
+
+class Schedule:
+    """ Intervals of one venue or artist, in an interval tree . Stored shows
+    can overlap ( nothing enforces it outside Postgres ), adding and finding
+    are O(log n) either way ( expected, over the treap priorities ) . """
+
+    def __init__(self):
+        self.root = None
+
+    def find(self, start, end):
+        """ Label of an interval overlapping [start, end), or None . """
+        if start >= end:
+            return None
+        node = self.root
+        while node is not None:
+            if node.start < end and node.end > start:
+                return node.label
+            # When the left subtree reaches start but holds no overlap, its
+            # interval ending last starts at or after end, and so does every
+            # interval to the right : the left side is the only candidate .
+            if node.left is not None and node.left.reach > start:
+                node = node.left
+            else:
+                node = node.right
+        return None
+
+    def add(self, start, end, label):
+        if start >= end:
+            # Empty, like an empty tstzrange it overlaps nothing .
+            return
+        self.root = self.insert(self.root, Interval(start, end, label))
+
+    def insert(self, node, interval):
+        if node is None:
+            return interval
+        side = 'left' if interval.start < node.start else 'right'
+        setattr(node, side, self.insert(getattr(node, side), interval))
+        if getattr(node, side).priority > node.priority:
+            return rotate(node, side)
+        node.update()
+        return node
+
+
+class ConflictChecker:
+    """ Venue and artist schedules of a set of proposed shows . """
+
+    def __init__(self):
+        self.schedules = {'venue': {}, 'artist': {}}
+
+    def schedule(self, side, owner_id):
+        return self.schedules[side].setdefault(owner_id, Schedule())
+
+    def load(self, session, Show, records, *criteria):
+        """ Book the stored shows that could collide with records, the
+        shows of their venues and artists within the span of the batch .
+        criteria narrow the stored shows, e.g. live(Show) so the shows of
+        deleted venues / artists hold nothing . """
+        if not records:
+            return self
+        start = min(record['start_time'] for record in records)
+        end = max(record['end_time'] for record in records)
+        for side in self.schedules:
+            foreign_key = getattr(Show, side + '_id')
+            owners = {record[side + '_id'] for record in records}
+            rows = session.query(foreign_key, Show.id, Show.start_time, Show.end_time)\
+                .filter(foreign_key.in_(owners), Show.start_time < end, Show.end_time > start, *criteria)\
+                .order_by(foreign_key, Show.start_time)
+            for owner_id, show_id, show_start, show_end in rows:
+                self.schedule(side, owner_id).add(show_start, show_end, f'show {show_id}')
+        return self
+
+    def check(self, record):
+        """ Conflicts of a proposed show, [] when it can be booked . """
+        conflicts = []
+        for side in self.schedules:
+            other = self.schedule(side, record[side + '_id'])\
+                .find(record['start_time'], record['end_time'])
+            if other is not None:
+                conflicts.append(Conflict(side, other))
+        return conflicts
+
+    def book(self, record, label):
+        """ Check record and book it when it's free, returns its conflicts . """
+        conflicts = self.check(record)
+        if not conflicts:
+            for side in self.schedules:
+                self.schedule(side, record[side + '_id'])\
+                    .add(record['start_time'], record['end_time'], label)
+        return conflicts
+
+
+def booking_end(start_time, duration=None, end_time=None):
+    """ end_time of a show starting at the aware start_time, end_time when
+    given, else duration minutes ( DEFAULT_SHOW_MINUTES ) later . """
+    if end_time is not None:
+        return end_time
+    return start_time.astimezone(timezone.utc) + timedelta(minutes=duration or DEFAULT_SHOW_MINUTES)
+
+
+def describe(conflicts):
+    """ Error messages of conflicts . """
+    return [f'The {conflict.side} already has {conflict.other} at that time.'
+            for conflict in conflicts]
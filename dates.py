@@ -0,0 +1,85 @@
+"""
+Dates of the pages : the `datetime` template filter and venue timezones .
+
+Views hand the templates native datetimes and the filter formats each one
+once. Babel patterns are compiled once per (locale, format) and formatted
+values are memoized, a show time on many pages is formatted once per process .
+Show times are stored in UTC and shown in the timezone of their venue .
+"""
+from datetime import date, datetime, time, timedelta
+from functools import lru_cache
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+# Named formats of the filter, anything else is used as a Babel pattern .
+FORMATS = {
+    'full': "EEEE MMMM, d, y 'at' h:mma",
+    'medium': "EE MM, dd, y h:mma",
+}
+
+DEFAULT_LOCALE = 'en_US'
+DEFAULT_TIMEZONE = 'UTC'
+
+
+@lru_cache(maxsize=None)
+def compiled_pattern(locale, format):
+    """ (Locale, DateTimePattern) of a locale name and a format . """
+    # Imported on first use, most requests never format a date .
+    from babel import Locale
+    from babel.dates import parse_pattern
+    return Locale.parse(locale), parse_pattern(FORMATS.get(format, format))
+
+
+@lru_cache(maxsize=8192)
+def _format(value, tzinfo, format, locale):
+    # tzinfo is part of the key, the same instant reads differently per zone .
+    locale, pattern = compiled_pattern(locale, format)
+    return pattern.apply(value, locale)
+
+
+def format_datetime(value, format='medium', tz=None, locale=DEFAULT_LOCALE):
+    """ value formatted in the timezone named tz ( its own zone if None ) . """
+    if value is None or value == '':
+        return ''
+    if not isinstance(value, date):
+        # Text, e.g. view dicts cached before views passed datetimes .
+        import dateutil.parser
+        value = dateutil.parser.parse(value)
+    if tz and getattr(value, 'tzinfo', None) is not None:
+        value = value.astimezone(zone(tz))
+    return _format(value, getattr(value, 'tzinfo', None), format, locale)
+
+
+#----------------------------------------------------------------------------#
+# Timezones.
+#----------------------------------------------------------------------------#
+
+@lru_cache(maxsize=None)
+def zone(name):
+    """ ZoneInfo of an IANA name, raises ZoneInfoNotFoundError ( a KeyError ) . """
+    return ZoneInfo(name)
+
+
+def is_timezone(name):
+    try:
+        zone(name)
+    except (ZoneInfoNotFoundError, ValueError):
+        return False
+    return True
+
+
+def localize(value, tz):
+    """ Aware datetime of a wall clock time at tz, aware values are kept . """
+    return value if value.tzinfo is not None else value.replace(tzinfo=zone(tz))
+
+
+def parse_moment(value, tz, end=False):
+    """ Aware datetime of an ISO 8601 date or date-time, raises ValueError .
+    Values without an offset are in tz, a date is the start of that day or,
+    with end, the start of the next one so that the day is included . """
+    try:
+        day = date.fromisoformat(value)
+    except ValueError:
+        moment = datetime.fromisoformat(value)
+    else:
+        moment = datetime.combine(day + timedelta(days=1) if end else day, time())
+    return localize(moment, tz)
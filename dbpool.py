@@ -0,0 +1,89 @@
+import threading
+import time
+
+from sqlalchemy import exc
+from sqlalchemy.pool import QueuePool
+
+#----------------------------------------------------------------------------#
+# Connection pool metrics .
+# The engine uses InstrumentedQueuePool, which counts checkouts and times how
+# long each one waited for a connection, /metrics/pool reports it along with
+# the pool occupancy so the pool can be sized against the number of workers .
+#----------------------------------------------------------------------------#
+
+
+class PoolStats:
+    """ Counters of one pool, they live as long as the worker process . """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.checkouts = 0
+        self.overflow_checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.peak_checked_out = 0
+
+    def checked_out(self, waited, checked_out, overflow):
+        with self.lock:
+            self.checkouts += 1
+            self.overflow_checkouts += overflow
+            self.wait_total += waited
+            self.wait_max = max(self.wait_max, waited)
+            self.peak_checked_out = max(self.peak_checked_out, checked_out)
+
+    def timed_out(self, waited):
+        with self.lock:
+            self.timeouts += 1
+            self.wait_total += waited
+            self.wait_max = max(self.wait_max, waited)
+
+    def as_dict(self):
+        with self.lock:
+            return {
+                'checkouts': self.checkouts,
+                'overflow_checkouts': self.overflow_checkouts,
+                'timeouts': self.timeouts,
+                'wait_seconds_total': round(self.wait_total, 6),
+                'wait_seconds_max': round(self.wait_max, 6),
+                'wait_seconds_avg': round(self.wait_total / self.checkouts, 6) if self.checkouts else 0.0,
+                'peak_checked_out': self.peak_checked_out,
+            }
+
+
+class InstrumentedQueuePool(QueuePool):
+    """ QueuePool keeping PoolStats, the wait of a checkout includes opening
+    a new connection when the pool has none idle . """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            self.stats.timed_out(time.perf_counter() - started)
+            raise
+        self.stats.checked_out(time.perf_counter() - started,
+                               self.checkedout(), self.overflow() > 0)
+        return connection
+
+
+def pool_status(pool):
+    """ Occupancy of pool plus its PoolStats when it keeps any . """
+    status = {'class': type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        status.update({
+            'size': pool.size(),
+            'max_overflow': pool._max_overflow,
+            'checked_in': pool.checkedin(),
+            'checked_out': pool.checkedout(),
+            'overflow': max(pool.overflow(), 0),
+            'timeout': pool.timeout(),
+        })
+    stats = getattr(pool, 'stats', None)
+    if stats is not None:
+        status.update(stats.as_dict())
+    return status
@@ -5,14 +5,24 @@ from fabric.contrib.console import confirm
 
 
 def test():
+    # The tests run on in-memory SQLite, then every page is driven once on the
+    # configured database, benchmarks.driver exits with 1 when a request fails .
     with settings(warn_only=True):
         result = local(
-            "python test_tasks.py -v && python test_users.py -v", capture=True
+            "python -m pytest -q && python -m benchmarks.driver --label fab-test --requests 5 --warmup 1",
+            capture=True
         )
     if result.failed and not confirm("Tests failed. Continue?"):
         abort("Aborted at user request.")
 
 
+def bench(label, baseline=None):
+    """ fab bench:after,baseline=before on a database filled by benchmarks.datagen """
+    local("python -m benchmarks.driver --label {}".format(label))
+    if baseline:
+        local("python -m benchmarks.driver --compare {} {}".format(baseline, label))
+
+
 def commit():
     message = raw_input("Enter a git commit message: ")
     local("git add . && git commit -am '{}'".format(message))
@@ -40,7 +50,7 @@ def heroku():
 
 def heroku_test():
     local(
-        "heroku run python test_tasks.py -v && heroku run python test_users.py -v"
+        "heroku run python -m benchmarks.driver --label heroku --requests 5 --warmup 1"
     )
 
 
@@ -1,9 +1,14 @@
 from datetime import datetime
+from zoneinfo import available_timezones
 from flask_wtf import Form
-from wtforms import StringField, SelectField, SelectMultipleField, DateTimeField, BooleanField
-from wtforms.validators import DataRequired, AnyOf, URL
+from wtforms import StringField, SelectField, SelectMultipleField, DateTimeField, BooleanField, IntegerField
+from wtforms.validators import DataRequired, AnyOf, URL, NumberRange, Optional
+from conflicts import DEFAULT_SHOW_MINUTES
 from geners import Geners
 
+# Typed on the form, or read back from an export ( str() of the stored time ) .
+SHOW_TIME_FORMATS = ['%Y-%m-%d %H:%M:%S', '%Y-%m-%d %H:%M:%S%z', '%Y-%m-%d %H:%M:%S.%f%z']
+
 
 class ShowForm(Form):
     artist_id = StringField(
@@ -15,7 +20,19 @@ class ShowForm(Form):
     start_time = DateTimeField(
         'start_time',
         validators=[DataRequired()],
-        default=datetime.today()
+        default=datetime.today(),
+        # Without an offset it's the wall clock time at the venue .
+        format=SHOW_TIME_FORMATS
+    )
+    duration = IntegerField(
+        'duration', default=DEFAULT_SHOW_MINUTES,
+        validators=[Optional(), NumberRange(min=1, max=24 * 60)]
+    )
+    # Imports and exports carry end_time, it wins over duration .
+    end_time = DateTimeField(
+        'end_time',
+        validators=[Optional()],
+        format=SHOW_TIME_FORMATS
     )
 
 
@@ -85,6 +102,10 @@ class VenueForm(Form):
     address = StringField(
         'address', validators=[DataRequired()]
     )
+    timezone = SelectField(
+        'timezone', default='UTC',
+        choices=[(name, name) for name in sorted(available_timezones())]
+    )
     phone = StringField(
         'phone'
     )
@@ -124,7 +145,7 @@ class VenueForm(Form):
         ]
     )
     facebook_link = StringField(
-        'facebook_link', validators=[URL()]
+        'facebook_link', validators=[Optional(), URL()]
     )
 
 
@@ -232,7 +253,7 @@ class ArtistForm(Form):
     )
     facebook_link = StringField(
         # TODO implement enum restriction
-        'facebook_link', validators=[URL()]
+        'facebook_link', validators=[Optional(), URL()]
     )
 
 # TODO IMPLEMENT NEW ARTIST FORM AND NEW SHOW FORM
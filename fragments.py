@@ -0,0 +1,56 @@
+import os
+
+from jinja2 import FileSystemBytecodeCache
+
+from cache import MISSING, LRUCache
+
+#----------------------------------------------------------------------------#
+# Template fragments .
+# List pages render one tile per show / venue / artist, and the same tiles
+# show up on page after page . A tile is wrapped in
+#
+#     {% call fragment('show', show.show_id, show.venue_updated_at, ...) %}
+#
+# and rendered once per process for those values : the key is the kind plus
+# the updated_at of every row the tile shows, an edit changes the key and
+# the old tile ages out of the LRU . Templates themselves are compiled to
+# bytecode once, at deploy, by `flask compile-templates` .
+#----------------------------------------------------------------------------#
+
+# Keys carry the versions, the TTL only bounds how long unused tiles stay .
+FRAGMENT_TTL = 24 * 3600
+
+
+class FragmentCache:
+    """ Rendered tiles of this process, a size of 0 renders every time . """
+
+    def __init__(self, maxsize):
+        self.backend = LRUCache(maxsize=maxsize, ttl=FRAGMENT_TTL) if maxsize else None
+
+    def __call__(self, kind, *versions, caller):
+        if self.backend is None:
+            return caller()
+        key = ':'.join([kind] + [str(version) for version in versions])
+        html = self.backend.get(key)
+        if html is MISSING:
+            html = caller()
+            self.backend.set(key, html)
+        return html
+
+
+def init_app(app):
+    """ `fragment` template global and the bytecode cache of app . """
+    app.jinja_env.globals['fragment'] = FragmentCache(app.config.get('FRAGMENT_CACHE_SIZE', 0))
+    directory = app.config.get('JINJA_BYTECODE_CACHE')
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+        app.jinja_env.bytecode_cache = FileSystemBytecodeCache(directory)
+
+
+def compile_templates(env):
+    """ Compile every template, into the bytecode cache when env has one .
+    Returns how many . """
+    names = env.list_templates(extensions=['html'])
+    for name in names:
+        env.get_template(name)
+    return len(names)
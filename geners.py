@@ -21,3 +21,19 @@ class Geners(Enum):
     ROCK_N_ROLL = 'Rock n Roll'
     SOUL = 'Soul'
     OTHER = 'Other'
+
+
+GENRE_NAMES = {genre.value.lower(): genre.value for genre in Geners}
+
+
+def normalize_genres(values):
+    """ Keep the values that name a genre of Geners ( any case ), spelled
+    the Geners way, without duplicates and in the order they came . """
+    if isinstance(values, str):
+        values = [values]
+    genres = []
+    for value in values or []:
+        genre = GENRE_NAMES.get(value.strip().lower())
+        if genre and genre not in genres:
+            genres.append(genre)
+    return genres
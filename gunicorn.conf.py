@@ -0,0 +1,33 @@
+# gunicorn settings, every value can be overridden from the environment .
+import multiprocessing
+import os
+
+bind = '0.0.0.0:' + os.environ.get('PORT', '5000')
+
+# Processes x threads is how many requests run at once . Each worker has its
+# own pool, keep threads <= DB_POOL_SIZE + DB_MAX_OVERFLOW .
+workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1))
+threads = int(os.environ.get('GUNICORN_THREADS', 1))
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'gthread' if threads > 1 else 'sync')
+
+# Import the app and compile the templates once in the master, the workers
+# get them for free through fork .
+preload_app = True
+
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 30))
+graceful_timeout = int(os.environ.get('GUNICORN_GRACEFUL_TIMEOUT', 30))
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', 5))
+
+# Recycle a worker after that many requests ( 0 never ), jitter keeps them
+# from all restarting at once .
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 0))
+max_requests_jitter = int(os.environ.get('GUNICORN_MAX_REQUESTS_JITTER', 0))
+
+accesslog = os.environ.get('GUNICORN_ACCESS_LOG', '-')
+errorlog = '-'
+
+
+def post_fork(server, worker):
+    # Connections opened by the master can't be shared with a worker .
+    from wsgi import warm_pool
+    warm_pool()
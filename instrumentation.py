@@ -0,0 +1,187 @@
+import json
+import re
+import threading
+import time
+from collections import Counter
+
+from flask import Response, before_render_template, g, has_app_context, request, template_rendered
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+#----------------------------------------------------------------------------#
+# Request instrumentation .
+# Opt-in ( INSTRUMENTATION ), every request records its SQL statements, the
+# time spent in SQL, in rendering templates and in the rest of the view, and
+# the size of its response . Each request gets a Server-Timing header and a
+# JSON log line, the totals per route are served at /metrics in the
+# Prometheus text format . Like /metrics/pool they are those of this worker .
+# The same statement run N_PLUS_ONE_THRESHOLD times or more in one request
+# is reported as an N+1 : a query per row that should be a join or an IN .
+#----------------------------------------------------------------------------#
+
+# Numbers of an IN ( ... ) list vary with the rows, they are one placeholder .
+PLACEHOLDER_LISTS = re.compile(r'\(\s*(\?|%\(\w+\)s|%s|:\w+)(\s*,\s*(\?|%\(\w+\)s|%s|:\w+))+\s*\)')
+SPACES = re.compile(r'\s+')
+
+
+def statement_shape(statement):
+    """ statement without its varying parts, the same for every row of an N+1 . """
+    return PLACEHOLDER_LISTS.sub('(?)', SPACES.sub(' ', statement).strip())
+
+
+class RequestProfile:
+    """ What one request spent, kept on g while it runs . """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.statements = []
+        self.sql_time = 0.0
+        self.render_time = 0.0
+        self.render_started = []
+
+    def sql(self, statement, duration):
+        self.statements.append((duration, statement))
+        self.sql_time += duration
+
+    def repeated(self, threshold):
+        """ {statement shape: count} of the statements run threshold times or more . """
+        counts = Counter(statement_shape(statement) for _, statement in self.statements)
+        return {shape: count for shape, count in counts.items() if count >= threshold}
+
+    def slowest(self, count):
+        return [{'ms': round(duration * 1000, 3), 'statement': statement_shape(statement)}
+                for duration, statement in sorted(self.statements, key=lambda item: -item[0])[:count]]
+
+
+class RouteStats:
+    """ Totals per (route, method), they live as long as the worker process . """
+
+    COUNTERS = ('requests', 'queries', 'sql_seconds', 'render_seconds', 'view_seconds',
+                'response_bytes', 'n_plus_one')
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.routes = {}
+
+    def add(self, route, method, **values):
+        with self.lock:
+            totals = self.routes.setdefault((route, method), dict.fromkeys(self.COUNTERS, 0))
+            totals['requests'] += 1
+            for name, value in values.items():
+                totals[name] += value
+
+    def prometheus(self, prefix='fyyur'):
+        """ The totals in the Prometheus text exposition format . """
+        with self.lock:
+            routes = {key: dict(totals) for key, totals in self.routes.items()}
+        lines = []
+        for name in self.COUNTERS:
+            metric = f'{prefix}_route_{name}_total'
+            lines.append(f'# TYPE {metric} counter')
+            for (route, method), totals in sorted(routes.items()):
+                labels = 'route="%s",method="%s"' % (escape_label(route), method)
+                lines.append(f'{metric}{{{labels}}} {round(totals[name], 6)}')
+        return '\n'.join(lines) + '\n'
+
+
+def escape_label(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def current_profile():
+    if not has_app_context():
+        return None
+    return g.get('_profile')
+
+
+#----------------------------------------------------------------------------#
+# Hooks .
+#----------------------------------------------------------------------------#
+
+def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_started', []).append(time.perf_counter())
+
+
+def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info['query_started'].pop()
+    profile = current_profile()
+    if profile is not None:
+        profile.sql(statement, time.perf_counter() - started)
+
+
+def before_render(sender, template, context, **extra):
+    profile = current_profile()
+    if profile is not None:
+        profile.render_started.append(time.perf_counter())
+
+
+def rendered(sender, template, context, **extra):
+    profile = current_profile()
+    if profile is not None and profile.render_started:
+        duration = time.perf_counter() - profile.render_started.pop()
+        # Only the outermost template counts, includes are part of it .
+        if not profile.render_started:
+            profile.render_time += duration
+
+
+def init_app(app):
+    """ Instrument app when INSTRUMENTATION is set, adds /metrics . """
+    if not app.config.get('INSTRUMENTATION'):
+        return
+    # On the Engine class so the replica engines are timed too .
+    if not event.contains(Engine, 'before_cursor_execute', before_cursor_execute):
+        event.listen(Engine, 'before_cursor_execute', before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', after_cursor_execute)
+    before_render_template.connect(before_render, app)
+    template_rendered.connect(rendered, app)
+    threshold = app.config.get('N_PLUS_ONE_THRESHOLD', 5)
+    slowest = app.config.get('SLOWEST_STATEMENTS', 3)
+    stats = app.extensions['route_stats'] = RouteStats()
+    logger = app.logger.getChild('requests')
+
+    @app.before_request
+    def start_profile():
+        g._profile = RequestProfile()
+
+    @app.after_request
+    def record_profile(response):
+        profile = g.pop('_profile', None)
+        if profile is None:
+            return response
+        total = time.perf_counter() - profile.started
+        view = max(total - profile.sql_time - profile.render_time, 0.0)
+        # Streamed responses ( exports ) have no length before they are sent .
+        size = 0 if response.is_streamed else response.calculate_content_length() or 0
+        repeated = profile.repeated(threshold)
+        route = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+        stats.add(route, request.method, queries=len(profile.statements),
+                  sql_seconds=profile.sql_time, render_seconds=profile.render_time,
+                  view_seconds=view, response_bytes=size, n_plus_one=len(repeated))
+        response.headers.add('Server-Timing', ', '.join([
+            'db;dur=%.3f;desc="%d queries"' % (profile.sql_time * 1000, len(profile.statements)),
+            'view;dur=%.3f' % (view * 1000),
+            'render;dur=%.3f' % (profile.render_time * 1000),
+            'total;dur=%.3f' % (total * 1000),
+        ]))
+        logger.info(json.dumps({
+            'method': request.method,
+            'path': request.path,
+            'route': route,
+            'status': response.status_code,
+            'queries': len(profile.statements),
+            'sql_ms': round(profile.sql_time * 1000, 3),
+            'view_ms': round(view * 1000, 3),
+            'render_ms': round(profile.render_time * 1000, 3),
+            'total_ms': round(total * 1000, 3),
+            'bytes': size,
+            'slowest': profile.slowest(slowest),
+            'n_plus_one': [{'count': count, 'statement': shape} for shape, count in repeated.items()],
+        }))
+        for shape, count in repeated.items():
+            logger.warning(f'N+1 on {route}: {count} x {shape}')
+        return response
+
+    @app.route('/metrics')
+    def metrics():
+        """ Route totals of this worker, Prometheus text format . """
+        return Response(stats.prometheus(), mimetype='text/plain; version=0.0.4')
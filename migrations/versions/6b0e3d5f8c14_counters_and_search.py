@@ -0,0 +1,61 @@
+"""upcoming show counters, updated_at versions and the search indexes
+
+Revision ID: 6b0e3d5f8c14
+Revises: 3f1c2a9d7b10
+Create Date: 2026-10-18 09:15:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '6b0e3d5f8c14'
+down_revision = '3f1c2a9d7b10'
+branch_labels = None
+depends_on = None
+
+# Same expression as search.search_document(), the index only helps when
+# the queries use exactly this text .
+SEARCH_DOCUMENT = ("to_tsvector('simple'::regconfig, (((coalesce(name, '') || ' ') "
+                   "|| coalesce(city, '')) || ' ') || coalesce(state, ''))")
+
+# Times are stored as naive UTC until a7d3f0c81b26 .
+UTC_NOW = "timezone('utc', now())"
+
+
+def upgrade():
+    # Existing rows get the server defaults, the models set these columns on
+    # new rows so the defaults are dropped once the rows are filled in .
+    for table in ('venue', 'artist'):
+        op.add_column(table, sa.Column('upcoming_shows_count', sa.Integer(), server_default='0',
+                                       nullable=False))
+    for table in ('venue', 'artist', 'show'):
+        op.add_column(table, sa.Column('updated_at', sa.DateTime(), server_default=sa.text(UTC_NOW),
+                                       nullable=False))
+    op.add_column('show', sa.Column('is_upcoming', sa.Boolean(), server_default=sa.false(),
+                                    nullable=False))
+    # Same result as `flask sweep-shows --rebuild` .
+    op.execute(f'UPDATE show SET is_upcoming = start_time > {UTC_NOW}')
+    for table in ('venue', 'artist'):
+        op.execute(f'UPDATE {table} SET upcoming_shows_count = ('
+                   f'SELECT count(*) FROM show WHERE show.{table}_id = {table}.id AND show.is_upcoming)')
+    for table in ('venue', 'artist', 'show'):
+        op.alter_column(table, 'updated_at', server_default=None, existing_type=sa.DateTime(),
+                        existing_nullable=False)
+    op.alter_column('show', 'is_upcoming', server_default=None, existing_type=sa.Boolean(),
+                    existing_nullable=False)
+    op.create_index('ix_venue_search', 'venue', [sa.text(SEARCH_DOCUMENT)],
+                    unique=False, postgresql_using='gin')
+    op.create_index('ix_artist_search', 'artist', [sa.text(SEARCH_DOCUMENT)],
+                    unique=False, postgresql_using='gin')
+
+
+def downgrade():
+    op.drop_index('ix_artist_search', table_name='artist')
+    op.drop_index('ix_venue_search', table_name='venue')
+    op.drop_column('show', 'is_upcoming')
+    for table in ('show', 'artist', 'venue'):
+        op.drop_column(table, 'updated_at')
+    for table in ('artist', 'venue'):
+        op.drop_column(table, 'upcoming_shows_count')
@@ -0,0 +1,60 @@
+"""indexes for the hot filter paths
+
+Revision ID: 8d4e6b2c5a31
+Revises: 6b0e3d5f8c14
+Create Date: 2026-10-18 09:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8d4e6b2c5a31'
+down_revision = '6b0e3d5f8c14'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # CONCURRENTLY keeps the tables writable while the indexes build, it
+    # can't run inside the migration transaction .
+    with op.get_context().autocommit_block():
+        # Detail pages : shows of one venue / artist ordered by start_time .
+        op.create_index('ix_show_venue_id_start_time', 'show', ['venue_id', 'start_time'], unique=False,
+                        postgresql_concurrently=True)
+        op.create_index('ix_show_artist_id_start_time', 'show', ['artist_id', 'start_time'], unique=False,
+                        postgresql_concurrently=True)
+        # /shows keyset pages and the sweep of shows that have now passed .
+        op.create_index('ix_show_start_time_id', 'show', ['start_time', 'id'], unique=False,
+                        postgresql_concurrently=True)
+        op.create_index('ix_show_upcoming_start_time', 'show', ['start_time'], unique=False,
+                        postgresql_where=sa.text('is_upcoming'), postgresql_concurrently=True)
+        # Listing ETags read max(updated_at) .
+        op.create_index(op.f('ix_show_updated_at'), 'show', ['updated_at'], unique=False,
+                        postgresql_concurrently=True)
+        op.create_index(op.f('ix_venue_updated_at'), 'venue', ['updated_at'], unique=False,
+                        postgresql_concurrently=True)
+        op.create_index(op.f('ix_artist_updated_at'), 'artist', ['updated_at'], unique=False,
+                        postgresql_concurrently=True)
+        # /venues grouping by area .
+        op.create_index('ix_venue_city_state_id', 'venue', ['city', 'state', 'id'], unique=False,
+                        postgresql_concurrently=True)
+        # Genre containment / overlap on the ARRAY columns .
+        op.create_index('ix_venue_genres', 'venue', ['genres'], unique=False, postgresql_using='gin',
+                        postgresql_concurrently=True)
+        op.create_index('ix_artist_genres', 'artist', ['genres'], unique=False, postgresql_using='gin',
+                        postgresql_concurrently=True)
+
+
+def downgrade():
+    op.drop_index('ix_artist_genres', table_name='artist')
+    op.drop_index('ix_venue_genres', table_name='venue')
+    op.drop_index('ix_venue_city_state_id', table_name='venue')
+    op.drop_index(op.f('ix_artist_updated_at'), table_name='artist')
+    op.drop_index(op.f('ix_venue_updated_at'), table_name='venue')
+    op.drop_index(op.f('ix_show_updated_at'), table_name='show')
+    op.drop_index('ix_show_upcoming_start_time', table_name='show')
+    op.drop_index('ix_show_start_time_id', table_name='show')
+    op.drop_index('ix_show_artist_id_start_time', table_name='show')
+    op.drop_index('ix_show_venue_id_start_time', table_name='show')
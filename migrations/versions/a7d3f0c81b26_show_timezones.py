@@ -0,0 +1,35 @@
+"""timezone aware show times and venue timezones
+
+Revision ID: a7d3f0c81b26
+Revises: c52e9a17f4d8
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a7d3f0c81b26'
+down_revision = 'c52e9a17f4d8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('venue', sa.Column('timezone', sa.String(length=64), nullable=False,
+                                     server_default='UTC'))
+    # Existing times were entered without a zone . Every venue starts on UTC,
+    # so reading them as UTC keeps the times the pages show; set the venue
+    # timezones afterwards and re-enter the shows that have to move .
+    # The start_time indexes are rebuilt by the type change .
+    op.alter_column('show', 'start_time', type_=sa.DateTime(timezone=True),
+                    existing_type=sa.DateTime(), existing_nullable=False,
+                    postgresql_using="start_time AT TIME ZONE 'UTC'")
+
+
+def downgrade():
+    op.alter_column('show', 'start_time', type_=sa.DateTime(),
+                    existing_type=sa.DateTime(timezone=True), existing_nullable=False,
+                    postgresql_using="start_time AT TIME ZONE 'UTC'")
+    op.drop_column('venue', 'timezone')
@@ -0,0 +1,42 @@
+"""cancelled shows of deleted venues / artists stop holding bookings
+
+Revision ID: b3e71c4a9f25
+Revises: f2a8d61c3e97
+Create Date: 2026-10-18 20:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b3e71c4a9f25'
+down_revision = 'f2a8d61c3e97'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('show', sa.Column('cancelled', sa.Boolean(), nullable=False,
+                                    server_default=sa.false()))
+    # Upcoming shows of the venues and artists already deleted .
+    op.execute('UPDATE show SET cancelled = true WHERE start_time > now() '
+               'AND (venue_id IN (SELECT id FROM venue WHERE deleted_at IS NOT NULL) '
+               'OR artist_id IN (SELECT id FROM artist WHERE deleted_at IS NOT NULL))')
+    op.alter_column('show', 'cancelled', server_default=None, existing_type=sa.Boolean(),
+                    existing_nullable=False)
+    for side in ('venue', 'artist'):
+        op.drop_constraint(f'ex_show_{side}_booking', 'show')
+        op.execute(f'ALTER TABLE show ADD CONSTRAINT ex_show_{side}_booking '
+                   f'EXCLUDE USING gist ({side}_id WITH =, tstzrange(start_time, end_time) WITH &&) '
+                   f'WHERE (NOT cancelled)')
+
+
+def downgrade():
+    # Cancelled shows that overlap a later booking have to be removed by hand
+    # before the constraints can cover them again .
+    for side in ('artist', 'venue'):
+        op.drop_constraint(f'ex_show_{side}_booking', 'show')
+        op.execute(f'ALTER TABLE show ADD CONSTRAINT ex_show_{side}_booking '
+                   f'EXCLUDE USING gist ({side}_id WITH =, tstzrange(start_time, end_time) WITH &&)')
+    op.drop_column('show', 'cancelled')
@@ -0,0 +1,45 @@
+"""genre index tables behind the genre filter and facets
+
+Revision ID: c52e9a17f4d8
+Revises: 8d4e6b2c5a31
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c52e9a17f4d8'
+down_revision = '8d4e6b2c5a31'
+branch_labels = None
+depends_on = None
+
+GENRES = ('Alternative', 'Blues', 'Classical', 'Country', 'Electronic', 'Folk', 'Funk',
+          'Hip-Hop', 'Heavy Metal', 'Instrumental', 'Jazz', 'Musical Theatre', 'Pop',
+          'Punk', 'R&B', 'Reggae', 'Rock n Roll', 'Soul', 'Other')
+
+
+def upgrade():
+    for table, owner in (('venue_genre', 'venue'), ('artist_genre', 'artist')):
+        owner_id = owner + '_id'
+        op.create_table(table,
+                        sa.Column('genre', sa.String(length=50), nullable=False),
+                        sa.Column(owner_id, sa.Integer(), nullable=False),
+                        sa.ForeignKeyConstraint([owner_id], [owner + '.id'], ondelete='CASCADE'),
+                        sa.PrimaryKeyConstraint('genre', owner_id))
+        op.create_index(op.f(f'ix_{table}_{owner_id}'), table, [owner_id], unique=False)
+        # Existing rows, spelled the Geners way and without duplicates .
+        op.execute(sa.text(
+            f'INSERT INTO {table} (genre, {owner_id}) '
+            f'SELECT DISTINCT g.name, {owner}.id '
+            f'FROM {owner}, unnest({owner}.genres) AS raw(value) '
+            f'JOIN unnest(CAST(:genres AS varchar[])) AS g(name) ON lower(g.name) = lower(trim(raw.value))'
+        ).bindparams(genres=list(GENRES)))
+
+
+def downgrade():
+    op.drop_index(op.f('ix_artist_genre_artist_id'), table_name='artist_genre')
+    op.drop_table('artist_genre')
+    op.drop_index(op.f('ix_venue_genre_venue_id'), table_name='venue_genre')
+    op.drop_table('venue_genre')
@@ -0,0 +1,32 @@
+"""trigram indexes for fuzzy venue and artist name search
+
+Revision ID: d81f4c6a2e57
+Revises: b3e71c4a9f25
+Create Date: 2026-10-18 21:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd81f4c6a2e57'
+down_revision = 'b3e71c4a9f25'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    # CONCURRENTLY keeps the tables writable while the indexes build, it
+    # can't run inside the migration transaction .
+    with op.get_context().autocommit_block():
+        for table in ('venue', 'artist'):
+            op.create_index(f'ix_{table}_name_trgm', table, ['name'], unique=False,
+                            postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'},
+                            postgresql_concurrently=True)
+
+
+def downgrade():
+    for table in ('artist', 'venue'):
+        op.drop_index(f'ix_{table}_name_trgm', table_name=table)
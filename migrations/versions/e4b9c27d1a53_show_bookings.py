@@ -0,0 +1,46 @@
+"""show end times and no double bookings
+
+Revision ID: e4b9c27d1a53
+Revises: a7d3f0c81b26
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e4b9c27d1a53'
+down_revision = 'a7d3f0c81b26'
+branch_labels = None
+depends_on = None
+
+DEFAULT_SHOW_MINUTES = 120
+
+
+def upgrade():
+    op.execute('CREATE EXTENSION IF NOT EXISTS btree_gist')
+    op.add_column('show', sa.Column('end_time', sa.DateTime(timezone=True), nullable=True))
+    # Existing shows last DEFAULT_SHOW_MINUTES, cut short where the next show
+    # of the venue or the artist starts so the constraints below can be built .
+    # Shows booked at the same time end up empty, an empty range overlaps
+    # nothing : they stay listed and can be cleaned up by hand .
+    op.execute(sa.text(
+        'UPDATE show SET end_time = bounds.end_time FROM ('
+        ' SELECT id, LEAST('
+        '  start_time + make_interval(mins => :minutes),'
+        '  lead(start_time) OVER (PARTITION BY venue_id ORDER BY start_time, id),'
+        '  lead(start_time) OVER (PARTITION BY artist_id ORDER BY start_time, id)) AS end_time'
+        ' FROM show) AS bounds '
+        'WHERE show.id = bounds.id'
+    ).bindparams(minutes=DEFAULT_SHOW_MINUTES))
+    op.alter_column('show', 'end_time', existing_type=sa.DateTime(timezone=True), nullable=False)
+    for side in ('venue', 'artist'):
+        op.execute(f'ALTER TABLE show ADD CONSTRAINT ex_show_{side}_booking '
+                   f'EXCLUDE USING gist ({side}_id WITH =, tstzrange(start_time, end_time) WITH &&)')
+
+
+def downgrade():
+    for side in ('artist', 'venue'):
+        op.drop_constraint(f'ex_show_{side}_booking', 'show')
+    op.drop_column('show', 'end_time')
@@ -0,0 +1,42 @@
+"""soft deleted venues / artists and cascading show foreign keys
+
+Revision ID: f2a8d61c3e97
+Revises: e4b9c27d1a53
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f2a8d61c3e97'
+down_revision = 'e4b9c27d1a53'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    for table in ('venue', 'artist'):
+        op.add_column(table, sa.Column('deleted_at', sa.DateTime(), nullable=True))
+        op.create_index(f'ix_{table}_tombstones', table, ['deleted_at'], unique=False,
+                        postgresql_where=sa.text('deleted_at IS NOT NULL'))
+    # The new keys are added NOT VALID and validated once the migration
+    # transaction has committed : VALIDATE lets writes to show through while
+    # it scans the table, inside the transaction the lock taken by ADD
+    # CONSTRAINT would block them until the end anyway .
+    for column, table in (('venue_id', 'venue'), ('artist_id', 'artist')):
+        op.drop_constraint(f'show_{column}_fkey', 'show', type_='foreignkey')
+        op.execute(f'ALTER TABLE show ADD CONSTRAINT show_{column}_fkey FOREIGN KEY ({column}) '
+                   f'REFERENCES {table} (id) ON DELETE CASCADE NOT VALID')
+    with op.get_context().autocommit_block():
+        for column in ('venue_id', 'artist_id'):
+            op.execute(f'ALTER TABLE show VALIDATE CONSTRAINT show_{column}_fkey')
+
+def downgrade():
+    for column, table in (('venue_id', 'venue'), ('artist_id', 'artist')):
+        op.drop_constraint(f'show_{column}_fkey', 'show', type_='foreignkey')
+        op.create_foreign_key(f'show_{column}_fkey', 'show', table, [column], ['id'])
+    for table in ('artist', 'venue'):
+        op.drop_index(f'ix_{table}_tombstones', table_name=table)
+        op.drop_column(table, 'deleted_at')
@@ -0,0 +1,235 @@
+from datetime import datetime, timezone
+
+from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy.dialects.postgresql import ARRAY, ExcludeConstraint
+from sqlalchemy.orm import validates
+from sqlalchemy.types import TypeDecorator
+
+from geners import normalize_genres
+from replicas import RoutingSession
+from search import search_index, trigram_index
+
+#----------------------------------------------------------------------------#
+# Models Region .
+#----------------------------------------------------------------------------#
+
+# Bound to the app in create_app . The request session is removed ( rolled
+# back and its connection returned to the pool ) when the app context ends,
+# handlers only roll back on error .
+db = SQLAlchemy(session_options={'class_': RoutingSession})
+
+
+class UTCDateTime(TypeDecorator):
+    """ timestamptz on Postgres . Values are stored in UTC and come back as
+    aware UTC datetimes on every database, naive values are taken as UTC . """
+    impl = db.DateTime
+    cache_ok = True
+
+    def __init__(self):
+        super().__init__(timezone=True)
+
+    @property
+    def python_type(self):
+        return datetime
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        value = value.astimezone(timezone.utc)
+        # Only Postgres keeps the offset, other databases get the UTC wall time .
+        return value if dialect.name == 'postgresql' else value.replace(tzinfo=None)
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        if value.tzinfo is None:
+            return value.replace(tzinfo=timezone.utc)
+        return value.astimezone(timezone.utc)
+
+
+class GenreList(TypeDecorator):
+    """ varchar[] on Postgres, where the GIN indexes and the array operators
+    of PostgresSearch use it, a JSON list on the other databases . """
+    impl = ARRAY(db.String)
+    cache_ok = True
+
+    def load_dialect_impl(self, dialect):
+        if dialect.name == 'postgresql':
+            return dialect.type_descriptor(self.impl)
+        return dialect.type_descriptor(db.JSON())
+
+
+# Show Model .
+
+
+class Show(db.Model):
+    __tablename__ = 'show'
+    id = db.Column(db.Integer, primary_key=True)
+    venue_id = db.Column(db.Integer, db.ForeignKey(
+        'venue.id', ondelete='CASCADE'), nullable=False)
+    artist_id = db.Column(db.Integer, db.ForeignKey(
+        'artist.id', ondelete='CASCADE'), nullable=False)
+    # An instant, shown in the timezone of the venue .
+    start_time = db.Column(UTCDateTime, nullable=False)
+    # The show holds its venue and artist for [start_time, end_time) .
+    end_time = db.Column(UTCDateTime, nullable=False)
+    # True while the show is still counted in the venue/artist upcoming_shows_count .
+    is_upcoming = db.Column(db.Boolean, nullable=False, default=False)
+    updated_at = db.Column(db.DateTime, nullable=False, index=True,
+                           default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Set on the upcoming shows of a deleted venue / artist, so the booking
+    # constraints below let the other side be booked at that time again .
+    cancelled = db.Column(db.Boolean, nullable=False, default=False)
+    __table_args__ = (
+        # Detail pages read the shows of one venue / artist by start_time .
+        db.Index('ix_show_venue_id_start_time', 'venue_id', 'start_time'),
+        db.Index('ix_show_artist_id_start_time', 'artist_id', 'start_time'),
+        # Keyset pages of /shows and its ?from=&to= windows ( range scans ) .
+        db.Index('ix_show_start_time_id', 'start_time', 'id'),
+        # sweep-shows only looks at the shows still counted as upcoming .
+        db.Index('ix_show_upcoming_start_time', 'start_time',
+                 postgresql_where=db.text('is_upcoming')),
+        # No double bookings : the shows of a venue, and of an artist, must
+        # not overlap ( gist index, needs btree_gist ) . See conflicts.py .
+        ExcludeConstraint(('venue_id', '='), (db.func.tstzrange(start_time, end_time), '&&'),
+                          name='ex_show_venue_booking', using='gist',
+                          where=db.text('NOT cancelled')).ddl_if(dialect='postgresql'),
+        ExcludeConstraint(('artist_id', '='), (db.func.tstzrange(start_time, end_time), '&&'),
+                          name='ex_show_artist_booking', using='gist',
+                          where=db.text('NOT cancelled')).ddl_if(dialect='postgresql'),
+    )
+
+    def __repr__(self):
+        return f'<Show table => venue_id={self.venue_id} & artist_id={self.artist_id} \n start_time={self.start_time}/>'
+
+
+# Venue Model.
+
+class Venue(db.Model):
+    __tablename__ = 'venue'
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String)
+    city = db.Column(db.String(120))
+    state = db.Column(db.String(120))
+    address = db.Column(db.String(120))
+    phone = db.Column(db.String(120))
+    image_link = db.Column(db.String(500))
+    genres = db.Column(GenreList, nullable=True)
+    facebook_link = db.Column(db.String(120))
+    website = db.Column(db.String(500))
+    seeking_talent = db.Column(db.Boolean, default=False)
+    seeking_description = db.Column(db.String(500))
+    # IANA name, e.g. America/Chicago . Show times are entered and shown in it .
+    timezone = db.Column(db.String(64), nullable=False, default='UTC',
+                         server_default='UTC')
+    upcoming_shows_count = db.Column(
+        db.Integer, nullable=False, default=0, server_default='0')
+    updated_at = db.Column(db.DateTime, nullable=False, index=True,
+                           default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Set when the venue is deleted, purge-deleted removes the row later .
+    deleted_at = db.Column(db.DateTime, nullable=True)
+    # Shows go with the venue through ON DELETE CASCADE .
+    shows = db.relationship('Show', backref='venue', lazy=True, passive_deletes=True)
+    genre_links = db.relationship('VenueGenre', lazy=True,
+                                  cascade='all, delete-orphan')
+    __table_args__ = (
+        # The few deleted rows, read by the live filters and purge-deleted .
+        db.Index('ix_venue_tombstones', 'deleted_at',
+                 postgresql_where=db.text('deleted_at IS NOT NULL')),
+        search_index('ix_venue_search', name, city, state),
+        trigram_index('ix_venue_name_trgm', 'name'),
+        # /venues is grouped by area and paginated on (city, state, id) .
+        db.Index('ix_venue_city_state_id', 'city', 'state', 'id'),
+        db.Index('ix_venue_genres', 'genres', postgresql_using='gin'),
+    )
+
+    @validates('genres')
+    def validate_genres(self, key, genres):
+        genres = normalize_genres(genres)
+        links = {link.genre: link for link in self.genre_links}
+        self.genre_links = [links.get(genre) or VenueGenre(genre=genre)
+                            for genre in genres]
+        return genres
+
+    def __repr__(self):
+        return f"name = {self.name}, city={self.city},\n state={self.state},\naddress={self.address}, phone={self.phone}, image={self.image_link},\n, genres={self.genres} "
+
+# Artist Model .
+
+
+class Artist(db.Model):
+    __tablename__ = 'artist'
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String)
+    city = db.Column(db.String(120))
+    state = db.Column(db.String(120))
+    phone = db.Column(db.String(120))
+    genres = db.Column(GenreList, nullable=True)
+    image_link = db.Column(db.String(500))
+    website = db.Column(db.String(100))
+    facebook_link = db.Column(db.String(120))
+    seeking_venue = db.Column(db.Boolean, default=False)
+    seeking_description = db.Column(db.String(500))
+    upcoming_shows_count = db.Column(
+        db.Integer, nullable=False, default=0, server_default='0')
+    updated_at = db.Column(db.DateTime, nullable=False, index=True,
+                           default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Set when the artist is deleted, purge-deleted removes the row later .
+    deleted_at = db.Column(db.DateTime, nullable=True)
+    # Shows go with the artist through ON DELETE CASCADE .
+    shows = db.relationship('Show', backref='artist', lazy=True, passive_deletes=True)
+    genre_links = db.relationship('ArtistGenre', lazy=True,
+                                  cascade='all, delete-orphan')
+    __table_args__ = (
+        # The few deleted rows, read by the live filters and purge-deleted .
+        db.Index('ix_artist_tombstones', 'deleted_at',
+                 postgresql_where=db.text('deleted_at IS NOT NULL')),
+        search_index('ix_artist_search', name, city, state),
+        trigram_index('ix_artist_name_trgm', 'name'),
+        db.Index('ix_artist_genres', 'genres', postgresql_using='gin'),
+    )
+
+    @validates('genres')
+    def validate_genres(self, key, genres):
+        genres = normalize_genres(genres)
+        links = {link.genre: link for link in self.genre_links}
+        self.genre_links = [links.get(genre) or ArtistGenre(genre=genre)
+                            for genre in genres]
+        return genres
+
+
+# Genre index .
+# One row per (genre, venue) / (genre, artist), kept in step with the genres
+# column by validate_genres . The primary key starts with genre so filtering
+# and facet counts are answered from the index .
+
+class VenueGenre(db.Model):
+    __tablename__ = 'venue_genre'
+    genre = db.Column(db.String(50), primary_key=True)
+    venue_id = db.Column(db.Integer, db.ForeignKey(
+        'venue.id', ondelete='CASCADE'), primary_key=True, index=True)
+
+
+class ArtistGenre(db.Model):
+    __tablename__ = 'artist_genre'
+    genre = db.Column(db.String(50), primary_key=True)
+    artist_id = db.Column(db.Integer, db.ForeignKey(
+        'artist.id', ondelete='CASCADE'), primary_key=True, index=True)
+
+
+# Public fields of each model, shared by the pages and the JSON API .
+VENUE_FIELDS = ('id', 'name', 'genres', 'address', 'city', 'state', 'phone',
+                'website', 'facebook_link', 'seeking_talent',
+                'seeking_description', 'image_link', 'timezone',
+                'upcoming_shows_count')
+ARTIST_FIELDS = ('id', 'name', 'genres', 'city', 'state', 'phone', 'website',
+                 'facebook_link', 'seeking_venue', 'seeking_description',
+                 'image_link', 'upcoming_shows_count')
+SHOW_FIELDS = ('id', 'venue_id', 'artist_id', 'start_time', 'end_time')
+
+
+def to_dict(row, fields):
+    return {field: getattr(row, field) for field in fields}
+
@@ -0,0 +1,396 @@
+from datetime import datetime, timezone
+from urllib.parse import urlencode
+
+from flask import Response, abort, current_app, make_response, request, session
+from werkzeug.local import LocalProxy
+
+from cache import make_etag
+from dates import DEFAULT_TIMEZONE, is_timezone, parse_moment
+from geners import Geners, normalize_genres
+from models import db, Show, Venue, Artist, to_dict
+from pagination import InvalidCursor, keyset_page
+from search import make_search
+
+#----------------------------------------------------------------------------#
+# Helpers shared by the venue, artist and show pages .
+#----------------------------------------------------------------------------#
+
+# View cache of the current app ( see create_app ), for the view-model dicts
+# of the read-heavy pages .
+view_cache = LocalProxy(lambda: current_app.extensions['view_cache'])
+
+
+#----------------------------------------------------------------------------#
+# Upcoming show counters.
+#----------------------------------------------------------------------------#
+
+def add_upcoming_show(show):
+    """ Count a new show in its venue and artist if it hasn't started yet. """
+    if show.start_time <= datetime.now(timezone.utc):
+        return
+    show.is_upcoming = True
+    for model, entity_id in ((Venue, show.venue_id), (Artist, show.artist_id)):
+        model.query.filter_by(id=entity_id)\
+            .update({model.upcoming_shows_count: model.upcoming_shows_count + 1},
+                    synchronize_session=False)
+
+
+def release_upcoming_shows(*criteria):
+    """ Take the counted shows matching criteria out of the venue and artist
+    counters, returns how many shows were released . """
+    for model, foreign_key in ((Venue, Show.venue_id), (Artist, Show.artist_id)):
+        released = db.session.query(db.func.count(Show.id))\
+            .filter(Show.is_upcoming, foreign_key == model.id, *criteria)\
+            .scalar_subquery()
+        affected = db.session.query(foreign_key)\
+            .filter(Show.is_upcoming, *criteria)
+        model.query.filter(model.id.in_(affected))\
+            .update({model.upcoming_shows_count: model.upcoming_shows_count - released},
+                    synchronize_session=False)
+    return Show.query.filter(Show.is_upcoming, *criteria)\
+        .update({Show.is_upcoming: False}, synchronize_session=False)
+
+
+def rebuild_upcoming_shows():
+    """ Recompute every counter from the show table, used to backfill . """
+    now = datetime.now(timezone.utc)
+    Show.query.update({Show.is_upcoming: Show.start_time > now},
+                      synchronize_session=False)
+    for model, foreign_key in ((Venue, Show.venue_id), (Artist, Show.artist_id)):
+        upcoming = db.session.query(db.func.count(Show.id))\
+            .filter(Show.is_upcoming, foreign_key == model.id)\
+            .scalar_subquery()
+        model.query.update({model.upcoming_shows_count: upcoming},
+                           synchronize_session=False)
+
+
+#----------------------------------------------------------------------------#
+# Cache invalidation.
+#----------------------------------------------------------------------------#
+
+def venue_namespaces(venue_id):
+    """ Cached views showing the venue: its page, the listings and the
+    pages of the artists that played there . """
+    artists = db.session.query(Show.artist_id)\
+        .filter(Show.venue_id == venue_id).distinct()
+    return [f'venue:{venue_id}', 'venues', 'shows'] + [f'artist:{artist_id}' for artist_id, in artists]
+
+
+def artist_namespaces(artist_id):
+    """ Cached views showing the artist: its page, the shows listing and the
+    pages of the venues it played at . """
+    venues = db.session.query(Show.venue_id)\
+        .filter(Show.artist_id == artist_id).distinct()
+    return [f'artist:{artist_id}', 'shows'] + [f'venue:{venue_id}' for venue_id, in venues]
+
+
+#----------------------------------------------------------------------------#
+# Deletes.
+# Deleting a venue / artist only tombstones its row ( deleted_at ), its shows
+# are left alone and hidden by live() . `flask purge-deleted` removes the
+# rows and their shows later, in small batches .
+#----------------------------------------------------------------------------#
+
+def tombstoned(model):
+    """ Ids of the deleted rows of model waiting for purge-deleted, never
+    correlated to a query that joins model itself . """
+    return db.select(model.id).where(model.deleted_at.isnot(None)).correlate(None)
+
+
+def live(model):
+    """ Criteria hiding deleted rows of model, for Show the shows of
+    deleted venues and artists . """
+    if model is Show:
+        return [Show.venue_id.notin_(tombstoned(Venue)),
+                Show.artist_id.notin_(tombstoned(Artist))]
+    return [model.deleted_at.is_(None)]
+
+
+def soft_delete(model, entity_id):
+    """ Tombstone a venue / artist with a single UPDATE, returns its name, or
+    None when there is no such row left . """
+    return db.session.execute(
+        db.update(model)
+        .where(model.id == entity_id, model.deleted_at.is_(None))
+        .values(deleted_at=datetime.utcnow())
+        .returning(model.name)).scalar()
+
+
+def cancel_shows(*criteria):
+    """ Cancel the shows matching criteria that haven't started, the shows of
+    a deleted venue / artist, so they stop holding the other side's bookings .
+    Past shows are left to purge-deleted, the UPDATE doesn't grow with the
+    history of the venue / artist . """
+    return Show.query.filter(Show.cancelled.is_(False), Show.start_time > datetime.now(timezone.utc),
+                             *criteria)\
+        .update({Show.cancelled: True}, synchronize_session=False)
+
+
+#----------------------------------------------------------------------------#
+# Conditional GET.
+#----------------------------------------------------------------------------#
+
+def validators(versions, last_modified):
+    """ (etag, last_modified, not_modified) of the page for these versions . """
+    etag = make_etag(request.path, request.query_string, *versions)
+    if last_modified is not None:
+        last_modified = last_modified.replace(microsecond=0, tzinfo=timezone.utc)
+    # A pending flash message has to be rendered, never answer 304 then .
+    not_modified = '_flashes' not in session and (
+        request.if_none_match.contains(etag) if request.if_none_match else
+        bool(last_modified and request.if_modified_since and
+             last_modified <= request.if_modified_since))
+    return etag, last_modified, not_modified
+
+
+def with_validators(response, etag, last_modified):
+    response.set_etag(etag)
+    response.last_modified = last_modified
+    response.cache_control.no_cache = True
+    return response
+
+
+def conditional(versions, last_modified, render):
+    """ Answer 304 when the client already has the page for these versions,
+    render() only runs when it doesn't . """
+    etag, last_modified, not_modified = validators(versions, last_modified)
+    response = Response(status=304) if not_modified else make_response(render())
+    return with_validators(response, etag, last_modified)
+
+
+def detail_versions_query(model, entity_id, foreign_key, other, other_key):
+    """ One aggregate over the entity, its shows and the other side of each
+    show : everything the detail page depends on . The page also changes when
+    a show starts and moves to the past shows, the last show to have started
+    is part of it . """
+    now = datetime.now(timezone.utc)
+    return db.select(model.updated_at, db.func.count(Show.id),
+                     db.func.count(Show.id).filter(Show.start_time > now),
+                     db.func.max(Show.updated_at), db.func.max(other.updated_at),
+                     db.func.max(Show.start_time).filter(Show.start_time <= now))\
+        .outerjoin(Show, foreign_key == model.id)\
+        .outerjoin(other, other.id == other_key)\
+        .where(model.id == entity_id, *live(model))\
+        .group_by(model.id)
+
+
+def detail_versions(model, entity_id, foreign_key, other, other_key):
+    return db.session.execute(
+        detail_versions_query(model, entity_id, foreign_key, other, other_key)).first()
+
+
+def detail_last_modified(versions):
+    """ Latest of the entity, show and other side updates and of the last
+    show to have started ( UTC wall times, like updated_at ) . """
+    started = versions[5] and versions[5].astimezone(timezone.utc).replace(tzinfo=None)
+    return max(filter(None, (versions[0], versions[3], versions[4], started)))
+
+
+def table_versions(*models):
+    """ Latest update of each table in one statement, for the listings . Each
+    max(updated_at) is one step down its index ; tombstones, counter changes
+    and edits all bump updated_at, purged rows were already hidden . """
+    return tuple(db.session.query(*[db.session.query(db.func.max(model.updated_at)).scalar_subquery()
+                                    for model in models]).one())
+
+
+#----------------------------------------------------------------------------#
+# Search.
+#----------------------------------------------------------------------------#
+
+def searcher(model):
+    """ Search engine for a model, Postgres full-text when the database
+    supports it, otherwise the in-process index . One per app . """
+    search_engines = current_app.extensions.setdefault('search_engines', {})
+    if model not in search_engines:
+        backend = current_app.config.get('SEARCH_BACKEND')
+        if not backend:
+            backend = 'postgres' if db.engine.dialect.name == 'postgresql' else 'memory'
+        search_engines[model] = make_search(model, backend)
+    return search_engines[model]
+
+
+def search_page(model):
+    """ Run the posted search_term against model and build the results
+    dict the search templates expect . """
+    page = max(request.form.get('page', 1, type=int), 1)
+    per_page = current_app.config.get('SEARCH_PAGE_SIZE', 20)
+    found = searcher(model).search(db.session, request.form.get('search_term', ''),
+                                   page=page, per_page=per_page)
+    return {
+        "count": found.total,
+        # More than COUNT_LIMIT results, count is shown as a lower bound .
+        "capped": found.capped,
+        "page": page,
+        "has_prev": page > 1,
+        "has_next": page * per_page < found.total,
+        "data": [{
+            "id": entity.id,
+            "name": entity.name,
+            "num_upcoming_shows": entity.upcoming_shows_count,
+        } for entity in found.items]
+    }
+
+
+#----------------------------------------------------------------------------#
+# Detail pages.
+#----------------------------------------------------------------------------#
+
+# Show columns of the venue / artist pages, with the make_show of each .
+VENUE_SHOW_COLUMNS = (Artist.id.label('artist_id'), Artist.name.label('artist_name'),
+                      Artist.image_link.label('artist_image_link'), Show.start_time)
+ARTIST_SHOW_COLUMNS = (Venue.id.label('venue_id'), Venue.name.label('venue_name'),
+                       Venue.image_link.label('venue_image_link'),
+                       Venue.timezone.label('venue_timezone'), Show.start_time)
+
+
+def venue_show(row):
+    return {
+        "artist_id": row.artist_id,
+        "artist_name": row.artist_name,
+        "artist_image_link": row.artist_image_link,
+        "start_time": row.start_time
+    }
+
+
+def artist_show(row):
+    return {
+        "venue_id": row.venue_id,
+        "venue_name": row.venue_name,
+        "venue_image_link": row.venue_image_link,
+        "venue_timezone": row.venue_timezone,
+        "start_time": row.start_time
+    }
+
+
+def detail_page(entity, fields, past_shows, upcoming_shows):
+    return {
+        **to_dict(entity, fields),
+        "past_shows": past_shows,
+        "upcoming_shows": upcoming_shows,
+        "past_shows_count": len(past_shows),
+        "upcoming_shows_count": len(upcoming_shows),
+    }
+
+
+def split_shows(rows, make_show):
+    """ Split rows ordered by start_time into (past, upcoming) in one pass,
+    rows without a start_time ( entity with no shows ) are skipped . """
+    now = datetime.now(timezone.utc)
+    past_shows = []
+    upcoming_shows = []
+    for row in rows:
+        if row.start_time is None:
+            continue
+        if row.start_time > now:
+            upcoming_shows.append(make_show(row))
+        else:
+            past_shows.append(make_show(row))
+    return past_shows, upcoming_shows
+
+
+#----------------------------------------------------------------------------#
+# Pagination.
+#----------------------------------------------------------------------------#
+
+def paginate(query, columns, key):
+    """ Keyset page of query for the cursor / per_page request args . """
+    per_page = request.args.get('per_page', current_app.config['PAGE_SIZE'], type=int)
+    per_page = min(max(per_page, 1), current_app.config['MAX_PAGE_SIZE'])
+    try:
+        return keyset_page(query, columns, key,
+                           cursor=request.args.get('cursor'), per_page=per_page)
+    except InvalidCursor:
+        abort(400, 'Invalid cursor')
+
+
+def page_url(cursor):
+    """ Current url with its cursor replaced, other args are kept . """
+    args = request.args.copy()
+    args['cursor'] = cursor
+    return request.path + '?' + urlencode(list(args.items(multi=True)))
+
+
+#----------------------------------------------------------------------------#
+# Show windows.
+# /shows and /api/v1/shows take ?from=&to= ( ISO 8601 dates or date-times,
+# in ?tz= when they have no offset ) and ?city= . The window is a range scan
+# of the (start_time, id) index that the keyset pages continue .
+#----------------------------------------------------------------------------#
+
+def show_window():
+    """ Criteria on Show for the from / to / city args, from is inclusive
+    and to exclusive ( a date as to includes that day ) . """
+    tz = request.args.get('tz', DEFAULT_TIMEZONE)
+    if not is_timezone(tz):
+        abort(400, 'Unknown timezone')
+    criteria = []
+    try:
+        if request.args.get('from'):
+            criteria.append(Show.start_time >= parse_moment(request.args['from'], tz))
+        if request.args.get('to'):
+            criteria.append(Show.start_time < parse_moment(request.args['to'], tz, end=True))
+    except ValueError:
+        abort(400, 'from / to must be ISO 8601 dates or date-times')
+    city = request.args.get('city', '').strip()
+    if city:
+        criteria.append(Show.venue_id.in_(
+            db.select(Venue.id).where(db.func.lower(Venue.city) == city.lower())))
+    return criteria
+
+
+#----------------------------------------------------------------------------#
+# Genre facets.
+# /venues and /artists take ?genre=Jazz&genre=Blues ( every genre has to
+# match ) and show a count per genre, both read the genre index tables .
+#----------------------------------------------------------------------------#
+
+def requested_genres():
+    values = request.args.getlist('genre')
+    genres = normalize_genres(values)
+    if len(genres) != len({value.strip().lower() for value in values}):
+        abort(400, 'Unknown genre')
+    return genres
+
+
+def genre_filter(link_model, owner_key, genres):
+    """ Ids of the owners linked to every genre of genres . """
+    owner_id = getattr(link_model, owner_key)
+    return db.session.query(owner_id)\
+        .filter(link_model.genre.in_(genres))\
+        .group_by(owner_id)\
+        .having(db.func.count() == len(genres))
+
+
+def genre_facets(link_model, owner_key, genres):
+    """ [{'genre', 'count', 'selected'}] for the Geners values, counts are
+    taken within the current selection so they tell how many results adding
+    that genre would leave . Deleted owners keep their rows until
+    purge-deleted and are left out . """
+    owner_id = getattr(link_model, owner_key)
+    owner = Venue if owner_key == 'venue_id' else Artist
+    query = db.session.query(link_model.genre, db.func.count())\
+        .filter(owner_id.notin_(tombstoned(owner)))
+    if genres:
+        owners = genre_filter(link_model, owner_key, genres).subquery()
+        query = query.join(owners, owner_id == list(owners.c)[0])
+    counts = dict(query.group_by(link_model.genre).all())
+    return [{'genre': genre.value,
+             'count': counts.get(genre.value, 0),
+             'selected': genre.value in genres} for genre in Geners
+            if counts.get(genre.value) or genre.value in genres]
+
+
+def genre_url(genre):
+    """ Current url with genre toggled, back to the first page . """
+    args = request.args.copy()
+    selected = args.poplist('genre')
+    args.pop('cursor', None)
+    for value in selected:
+        if value != genre:
+            args.add('genre', value)
+    if genre not in selected:
+        args.add('genre', genre)
+    query_string = urlencode(list(args.items(multi=True)))
+    return request.path + ('?' + query_string if query_string else '')
+
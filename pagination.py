@@ -0,0 +1,70 @@
+import base64
+import json
+from collections import namedtuple
+from datetime import datetime
+
+from sqlalchemy import literal, tuple_
+
+#----------------------------------------------------------------------------#
+# Keyset ( seek ) pagination .
+# A page is fetched with WHERE (sort columns) > (last row seen) instead of
+# OFFSET, so page 1000 costs the same as page 1 when the columns are indexed .
+#----------------------------------------------------------------------------#
+
+Page = namedtuple('Page', ['items', 'next_cursor', 'prev_cursor'])
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(values, direction):
+    values = [v.isoformat() if isinstance(v, datetime) else v for v in values]
+    raw = json.dumps({'k': values, 'd': direction}, separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor, columns):
+    """ Return (values, direction) of a cursor made by encode_cursor,
+    values are converted back to the python type of each column . """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        data = json.loads(raw)
+        values, direction = data['k'], data['d']
+        if direction not in ('next', 'prev') or len(values) != len(columns):
+            raise InvalidCursor(cursor)
+        return [datetime.fromisoformat(value) if column.type.python_type is datetime else value
+                for column, value in zip(columns, values)], direction
+    except (ValueError, TypeError, KeyError, NotImplementedError):
+        raise InvalidCursor(cursor)
+
+
+def seek_values(columns, values):
+    """ values bound with the type of their column, a datetime has to go
+    through the column type to compare with what the database stores . """
+    return tuple_(*[literal(value, column.type) for column, value in zip(columns, values)])
+
+
+def keyset_page(query, columns, key, cursor=None, per_page=50):
+    """ One page of query ordered by columns ( ascending ) .
+
+    key(row) returns the values of columns for a row, they become the
+    cursors of the previous / next page . """
+    values, direction = decode_cursor(cursor, columns) if cursor else (None, 'next')
+    if direction == 'next':
+        if values:
+            query = query.filter(tuple_(*columns) > seek_values(columns, values))
+        rows = query.order_by(*columns).limit(per_page + 1).all()
+        has_more = len(rows) > per_page
+        rows = rows[:per_page]
+        next_cursor = encode_cursor(key(rows[-1]), 'next') if has_more else None
+        prev_cursor = encode_cursor(key(rows[0]), 'prev') if values and rows else None
+    else:
+        query = query.filter(tuple_(*columns) < seek_values(columns, values))
+        rows = query.order_by(*[column.desc() for column in columns])\
+            .limit(per_page + 1).all()
+        has_more = len(rows) > per_page
+        rows = rows[:per_page][::-1]
+        prev_cursor = encode_cursor(key(rows[0]), 'prev') if has_more else None
+        next_cursor = encode_cursor(key(rows[-1]), 'next') if rows else None
+    return Page(rows, next_cursor, prev_cursor)
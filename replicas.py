@@ -0,0 +1,145 @@
+import itertools
+import threading
+import time
+
+from flask import current_app, has_app_context, has_request_context, request, session as cookie_session
+from flask_sqlalchemy.session import Session
+from sqlalchemy import Delete, Insert, Update, event
+
+#----------------------------------------------------------------------------#
+# Read replicas .
+# Reads made while answering a GET / HEAD ( or a view marked replica_reads )
+# go to the replicas in turn, everything else goes to the primary : writes,
+# reads of a request that has written, CLI commands, and every request of a
+# browser for a few seconds after it wrote so it reads its own writes .
+#----------------------------------------------------------------------------#
+
+REPLICA_BIND = 'replica:{}'
+
+# Cookie session key, requests before that time read from the primary .
+PRIMARY_UNTIL = '_primary_until'
+
+
+def replica_binds(uris, engine_options):
+    """ SQLALCHEMY_BINDS entries for the replica uris, with the same engine
+    options as the primary . """
+    return {REPLICA_BIND.format(number): {**engine_options, 'url': uri}
+            for number, uri in enumerate(uris)}
+
+
+def replica_reads(view):
+    """ Let a view that only reads use the replicas whatever its method,
+    e.g. the POST search forms . """
+    view.replica_reads = True
+    return view
+
+
+class ReplicaRouter:
+    """ Round-robin over the replica binds . A replica is checked with a
+    connection before it is used when it was last seen up more than
+    check_every seconds ago, one that fails is left out for retry_after
+    seconds . With no replica up reads go to the primary . """
+
+    def __init__(self, keys, retry_after=30, sticky=5, check_every=5):
+        self.keys = list(keys)
+        self.retry_after = retry_after
+        self.sticky = sticky
+        self.check_every = check_every
+        self.engines = {}
+        self.down_until = {}
+        self.up_at = {}
+        self.turn = itertools.count()
+        self.lock = threading.Lock()
+
+    def watch(self, engines):
+        """ Take the replica engines and listen for their connection errors . """
+        for key in self.keys:
+            def handle_error(context, key=key):
+                if context.is_disconnect or context.connection is None:
+                    self.mark_down(key)
+            self.engines[key] = engines[key]
+            event.listen(engines[key], 'handle_error', handle_error)
+
+    def mark_down(self, key):
+        self.down_until[key] = time.monotonic() + self.retry_after
+
+    def is_up(self, key):
+        now = time.monotonic()
+        if self.down_until.get(key, 0) > now:
+            return False
+        if now - self.up_at.get(key, float('-inf')) > self.check_every:
+            try:
+                self.engines[key].connect().close()
+            except Exception:
+                self.mark_down(key)
+                return False
+            self.up_at[key] = now
+        return True
+
+    def pick(self):
+        """ Next replica that is up, or None . """
+        with self.lock:
+            start = next(self.turn)
+        for offset in range(len(self.keys)):
+            key = self.keys[(start + offset) % len(self.keys)]
+            if self.is_up(key):
+                return key
+        return None
+
+    def status(self):
+        now = time.monotonic()
+        return {key: 'down' if self.down_until.get(key, 0) > now else 'up'
+                for key in self.keys}
+
+
+def read_only_request():
+    if not has_request_context():
+        return False
+    if request.method not in ('GET', 'HEAD'):
+        view = current_app.view_functions.get(request.endpoint)
+        if not getattr(view, 'replica_reads', False):
+            return False
+    return cookie_session.get(PRIMARY_UNTIL, 0) <= time.time()
+
+
+def current_router():
+    """ ReplicaRouter of the current app when it has replicas . """
+    if not has_app_context():
+        return None
+    router = current_app.extensions.get('replica_router')
+    return router if router and router.keys else None
+
+
+class RoutingSession(Session):
+    """ Flask-SQLAlchemy session choosing the primary or a replica for each
+    statement, see ReplicaRouter . """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        router = current_router() if bind is None else None
+        if router and not self._flushing and not self.info.get('wrote') \
+                and not isinstance(clause, (Insert, Update, Delete)) \
+                and read_only_request():
+            # One replica per session so a page never mixes two replication lags .
+            if 'replica' not in self.info:
+                self.info['replica'] = router.pick()
+            if self.info['replica'] is not None:
+                return self._db.engines[self.info['replica']]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+@event.listens_for(RoutingSession, 'after_flush')
+def _flushed(session, flush_context):
+    session.info['wrote'] = True
+
+
+@event.listens_for(RoutingSession, 'do_orm_execute')
+def _executed(state):
+    if state.is_insert or state.is_update or state.is_delete:
+        state.session.info['wrote'] = True
+
+
+@event.listens_for(RoutingSession, 'after_commit')
+def _committed(session):
+    router = current_router()
+    if session.info.pop('wrote', False) and router and has_request_context():
+        cookie_session[PRIMARY_UNTIL] = time.time() + router.sticky
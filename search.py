@@ -0,0 +1,274 @@
+import re
+import threading
+from bisect import bisect_left, insort
+from collections import defaultdict, namedtuple
+from datetime import timedelta
+
+from sqlalchemy import Index, String, and_, cast, func, literal_column, or_
+from sqlalchemy.dialects.postgresql import ARRAY, array
+
+from geners import Geners
+
+#----------------------------------------------------------------------------#
+# Search over venues and artists .
+# Documents are made of name, city, state and genres, every query token is
+# matched as a prefix ( "jaz" finds "Jazz" ) and all tokens have to match .
+# On Postgres a name token also matches fuzzily ( pg_trgm, "jaxx" finds
+# "Jazz" ) .
+#----------------------------------------------------------------------------#
+
+TOKEN_RE = re.compile(r'[^\W_]+')
+
+# How much a match in each field counts toward the rank .
+FIELD_WEIGHTS = {'name': 4, 'genres': 2, 'city': 1, 'state': 1}
+
+# Results counted at most, total is capped past that and the pages stop .
+COUNT_LIMIT = 1000
+
+# Words shorter than this have too few trigrams to match fuzzily .
+FUZZY_MIN_LENGTH = 3
+
+# MemorySearch re-reads the rows updated this long before the last update
+# it saw : a write commits a little after its updated_at, possibly after a
+# later write of another worker was already read .
+SYNC_OVERLAP = timedelta(seconds=30)
+
+SearchPage = namedtuple('SearchPage', ['total', 'items', 'page', 'per_page', 'capped'])
+
+
+def tokenize(text):
+    return [token.lower() for token in TOKEN_RE.findall(text or '')]
+
+
+def document_fields(entity):
+    return {
+        'name': entity.name,
+        'city': entity.city,
+        'state': entity.state,
+        'genres': ' '.join(entity.genres or []),
+    }
+
+
+def matching_genres(token):
+    """ Genres from the Geners enum that have a word starting with token . """
+    return [genre.value for genre in Geners
+            if any(word.startswith(token) for word in tokenize(genre.value))]
+
+
+class InvertedIndex:
+    """ Token -> {doc_id: weight} postings with a sorted token list so a
+    prefix can be expanded with a binary search . """
+
+    def __init__(self):
+        self.postings = defaultdict(dict)
+        self.tokens = []
+        self.documents = {}
+
+    def add(self, doc_id, fields):
+        self.remove(doc_id)
+        weights = {}
+        for field, value in fields.items():
+            for token in tokenize(value):
+                weights[token] = max(weights.get(token, 0), FIELD_WEIGHTS[field])
+        for token, weight in weights.items():
+            if token not in self.postings:
+                insort(self.tokens, token)
+            self.postings[token][doc_id] = weight
+        self.documents[doc_id] = list(weights)
+
+    def remove(self, doc_id):
+        for token in self.documents.pop(doc_id, []):
+            self.postings[token].pop(doc_id, None)
+            if not self.postings[token]:
+                del self.postings[token]
+                del self.tokens[bisect_left(self.tokens, token)]
+
+    def expand(self, prefix):
+        position = bisect_left(self.tokens, prefix)
+        while position < len(self.tokens) and self.tokens[position].startswith(prefix):
+            yield self.tokens[position]
+            position += 1
+
+    def search(self, query):
+        """ Return [(doc_id, score)] best first, exact token hits score
+        double a prefix hit . """
+        tokens = tokenize(query)
+        if not tokens:
+            return [(doc_id, 0) for doc_id in sorted(self.documents)]
+        scores = None
+        for query_token in tokens:
+            matches = {}
+            for token in self.expand(query_token):
+                boost = 2 if token == query_token else 1
+                for doc_id, weight in self.postings[token].items():
+                    matches[doc_id] = max(matches.get(doc_id, 0), weight * boost)
+            if scores is None:
+                scores = matches
+            else:
+                scores = {doc_id: score + matches[doc_id]
+                          for doc_id, score in scores.items() if doc_id in matches}
+            if not scores:
+                return []
+        return sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+
+
+class MemorySearch:
+    """ In-process index, built from the table on first use . Every worker
+    process holds its own copy : the create / edit / delete handlers update
+    the copy of the worker that wrote, and each search first reads the rows
+    updated since the last one ( updated_at is indexed ) so the writes of
+    other workers are picked up too . """
+
+    def __init__(self, model):
+        self.model = model
+        self.index = None
+        self.synced_at = None
+        self.lock = threading.Lock()
+
+    def rows(self, session, since=None):
+        model = self.model
+        query = session.query(model.id, model.name, model.city, model.state, model.genres,
+                              model.updated_at, model.deleted_at)
+        if since is None:
+            return query.filter(model.deleted_at.is_(None)).all()
+        return query.filter(model.updated_at >= since - SYNC_OVERLAP).all()
+
+    def apply(self, rows):
+        for row in rows:
+            if row.deleted_at is None:
+                self.index.add(row.id, document_fields(row))
+            else:
+                self.index.remove(row.id)
+            if self.synced_at is None or row.updated_at > self.synced_at:
+                self.synced_at = row.updated_at
+
+    def _ensure_index(self, session):
+        if self.index is None:
+            with self.lock:
+                if self.index is None:
+                    rows = self.rows(session)
+                    self.index = InvertedIndex()
+                    self.apply(rows)
+                    return
+        rows = self.rows(session, self.synced_at)
+        with self.lock:
+            self.apply(rows)
+
+    def add(self, entity):
+        if self.index is not None:
+            with self.lock:
+                self.index.add(entity.id, document_fields(entity))
+
+    def remove(self, entity_id):
+        if self.index is not None:
+            with self.lock:
+                self.index.remove(int(entity_id))
+
+    def reset(self):
+        self.index = None
+        self.synced_at = None
+
+    def search(self, session, term, page=1, per_page=20):
+        self._ensure_index(session)
+        ranked = self.index.search(term)
+        ids = [doc_id for doc_id, _ in ranked[(page - 1) * per_page:page * per_page]]
+        entities = {}
+        if ids:
+            # The index may still hold a row another worker has just deleted .
+            entities = {entity.id: entity for entity in
+                        session.query(self.model)
+                        .filter(self.model.id.in_(ids), self.model.deleted_at.is_(None))}
+        items = [entities[doc_id] for doc_id in ids if doc_id in entities]
+        return SearchPage(len(ranked), items, page, per_page, False)
+
+
+def search_document(name, city, state):
+    """ tsvector expression over name, city and state, search_index() builds
+    the same expression so Postgres can answer PostgresSearch from the index . """
+    text = func.coalesce(name, literal_column("''"))
+    for column in (city, state):
+        text = text.op('||')(literal_column("' '"))\
+            .op('||')(func.coalesce(column, literal_column("''")))
+    return func.to_tsvector(literal_column("'simple'::regconfig"), text)
+
+
+def search_index(index_name, name, city, state):
+    """ GIN index behind PostgresSearch, goes in the model __table_args__
+    and is only created on Postgres . """
+    return Index(index_name, search_document(name, city, state),
+                 postgresql_using='gin').ddl_if(dialect='postgresql')
+
+
+def trigram_index(index_name, column_name):
+    """ GIN trigram index behind the fuzzy name matches of PostgresSearch,
+    needs the pg_trgm extension, only created on Postgres . """
+    return Index(index_name, column_name, postgresql_using='gin',
+                 postgresql_ops={column_name: 'gin_trgm_ops'}).ddl_if(dialect='postgresql')
+
+
+def genres_overlap(column, genres):
+    """ column && ARRAY[genres], spelled out so it doesn't depend on the
+    comparator of the column type . """
+    return column.op('&&')(cast(array(genres), ARRAY(String)))
+
+
+class PostgresSearch:
+    """ Full-text search on the GIN tsvector index, genres are matched
+    against the Geners values so prefixes work on them as well, and names
+    fuzzily on the trigram index . """
+
+    def __init__(self, model):
+        self.model = model
+
+    def add(self, entity):
+        pass
+
+    def remove(self, entity_id):
+        pass
+
+    def reset(self):
+        pass
+
+    def query(self, session, term):
+        """ Live rows matching every token of term, best first . """
+        model = self.model
+        document = search_document(model.name, model.city, model.state)
+        query = session.query(model).filter(model.deleted_at.is_(None))
+        tokens = tokenize(term)
+        if tokens:
+            conditions = []
+            for token in tokens:
+                prefix = func.to_tsquery(literal_column("'simple'::regconfig"), token + ':*')
+                condition = document.op('@@')(prefix)
+                if len(token) >= FUZZY_MIN_LENGTH:
+                    # name %> token : token is close to a word of name .
+                    condition = or_(condition, model.name.op('%>')(token))
+                genres = matching_genres(token)
+                if genres:
+                    condition = or_(condition, genres_overlap(model.genres, genres))
+                conditions.append(condition)
+            query = query.filter(and_(*conditions))
+            tsquery = func.to_tsquery(literal_column("'simple'::regconfig"),
+                                      ' & '.join(token + ':*' for token in tokens))
+            query = query.order_by(func.ts_rank(document, tsquery).desc(),
+                                   func.word_similarity(term, model.name).desc())
+        return query
+
+    def search(self, session, term, page=1, per_page=20):
+        model = self.model
+        query = self.query(session, term)
+        # Counting stops past COUNT_LIMIT, and so do the pages .
+        counted = session.query(func.count()).select_from(
+            query.order_by(None).limit(COUNT_LIMIT + 1).subquery()).scalar()
+        total = min(counted, COUNT_LIMIT)
+        items = []
+        if (page - 1) * per_page < total:
+            items = query.order_by(model.id)\
+                .offset((page - 1) * per_page).limit(per_page).all()
+        return SearchPage(total, items, page, per_page, counted > COUNT_LIMIT)
+
+
+def make_search(model, backend):
+    if backend == 'postgres':
+        return PostgresSearch(model)
+    return MemorySearch(model)
@@ -0,0 +1,89 @@
+from flask import Blueprint, current_app, flash, render_template, request
+
+from conflicts import ConflictChecker, booking_end, describe
+from dates import localize
+from models import db, Artist, Show, Venue
+from pages import (add_upcoming_show, conditional, live, paginate, show_window, table_versions,
+                   view_cache)
+
+bp = Blueprint('shows', __name__)
+
+
+#  Shows
+#  ----------------------------------------------------------------
+
+@bp.route('/shows')
+def shows():
+    # ?from=&to=&city= narrow the listing to a window, see show_window .
+    window = show_window()
+    def build():
+        data = []
+        query = db.session.query(Venue.id, Venue.name, Artist.id, Artist.name, Artist.image_link, Show.start_time, Show.id, Venue.timezone,
+                                 Show.updated_at, Venue.updated_at, Artist.updated_at)\
+            .join(Show, Artist.id == Show.artist_id)\
+            .filter(Show.venue_id == Venue.id, *window, *live(Venue), *live(Artist))
+        page = paginate(query, [Show.start_time, Show.id],
+                        key=lambda item: (item[5], item[6]))
+        for item in page.items:
+            data.append({
+                "venue_id": item[0],  # venue.id
+                "venue_name": item[1],
+                "artist_id": item[2],
+                "artist_name": item[3],
+                "artist_image_link": item[4],
+                "start_time": item[5],
+                "venue_timezone": item[7],
+                # Versions of the tile, see fragments.py .
+                "show_id": item[6],
+                "show_updated_at": item[8],
+                "venue_updated_at": item[9],
+                "artist_updated_at": item[10],
+            })
+        return data, page._replace(items=None)
+    def render():
+        data, page = view_cache.get_or_set('shows', [request.query_string.decode(), *versions], build)
+        return render_template('pages/shows.html', shows=data, page=page,
+                               window=request.args)
+    versions = table_versions(Show, Venue, Artist)
+    return conditional(versions, max(filter(None, versions), default=None), render)
+
+
+@bp.route('/shows/create')
+def create_shows():
+    # renders form. do not touch.
+    from forms import ShowForm
+    form = ShowForm()
+    return render_template('forms/new_show.html', form=form)
+
+
+@bp.route('/shows/create', methods=['POST'])
+def create_show_submission():
+    import dateutil.parser
+    try:
+        artist_id = int(request.form['artist_id'])
+        venue_id = int(request.form['venue_id'])
+        venue = Venue.query.get(venue_id)
+        artist = Artist.query.get(artist_id)
+        if venue is None or artist is None or venue.deleted_at or artist.deleted_at:
+            raise ValueError('No such venue or artist')
+        # Entered as the wall clock time at the venue .
+        start_time = localize(dateutil.parser.parse(request.form['start_time']), venue.timezone)
+        end_time = booking_end(start_time, request.form.get('duration', type=int))
+        booking = {'venue_id': venue_id, 'artist_id': artist_id,
+                   'start_time': start_time, 'end_time': end_time}
+        conflicts = ConflictChecker().load(db.session, Show, [booking], *live(Show)).check(booking)
+        if conflicts:
+            flash('Show was not listed. ' + ' '.join(describe(conflicts)))
+            return render_template('pages/home.html')
+        show = Show(**booking)
+        add_upcoming_show(show)
+        db.session.add(show)
+        db.session.commit()
+        view_cache.invalidate(f'venue:{venue_id}', f'artist:{artist_id}', 'venues', 'shows')
+        # on successful db insert, flash success
+        flash('Show was successfully listed!')
+    except Exception:
+        current_app.logger.exception('Creating a show failed')
+        flash('Show was unsuccessfully listed!')
+        db.session.rollback()
+    return render_template('pages/home.html')
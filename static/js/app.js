@@ -3,8 +3,8 @@ console.log(' app.js here ');
 const deleteBtn = document.querySelectorAll('.delete-btn');
 deleteBtn.forEach((btn) =>
   btn.addEventListener('click', (e) => {
-    let venueID = e.target.dataset['id'];
-    fetch(`/venues/${venueID}`, {
+    let url = e.target.dataset['url'];
+    fetch(url, {
       method: 'DELETE',
     })
       .then((res) => {
@@ -0,0 +1,67 @@
+import os
+
+# Every test app gets its own in-memory SQLite database ( see config.py ), the
+# view cache is off so each request runs its queries, and debug keeps
+# create_app from logging to error.log .
+os.environ['DATABASE_URL'] = 'sqlite://'
+os.environ['CACHE_BACKEND'] = 'none'
+os.environ['FLASK_DEBUG'] = '1'
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import event
+
+from app import create_app
+from models import db, Artist, Show, Venue
+
+
+@pytest.fixture
+def app():
+    app = create_app()
+    app.config['TESTING'] = True
+    with app.app_context():
+        yield app
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def statements(app):
+    """ SQL statements sent to the database, clear it before a request . """
+    sent = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        sent.append(statement)
+    event.listen(db.engine, 'before_cursor_execute', record)
+    yield sent
+    event.remove(db.engine, 'before_cursor_execute', record)
+
+
+def add_venue(name='Venue', city='Austin', state='TX', genres=('Jazz',), **columns):
+    venue = Venue(name=name, city=city, state=state, address='1 Main St', phone='512-555-0100',
+                  genres=list(genres), **columns)
+    db.session.add(venue)
+    db.session.commit()
+    return venue
+
+
+def add_artist(name='Artist', city='Austin', state='TX', genres=('Jazz',), **columns):
+    artist = Artist(name=name, city=city, state=state, phone='512-555-0101', genres=list(genres),
+                    **columns)
+    db.session.add(artist)
+    db.session.commit()
+    return artist
+
+
+def add_show(venue, artist, days=1, hours=2):
+    """ Show starting days from now ( in the past when negative ) . """
+    start = datetime.now(timezone.utc) + timedelta(days=days)
+    show = Show(venue_id=venue.id, artist_id=artist.id, start_time=start,
+                end_time=start + timedelta(hours=hours), is_upcoming=days > 0)
+    db.session.add(show)
+    db.session.commit()
+    return show
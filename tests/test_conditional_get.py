@@ -0,0 +1,40 @@
+from datetime import datetime, timedelta
+
+from conftest import add_artist, add_show, add_venue
+from models import db, Show, Venue
+
+
+def test_listing_versions_dont_count_rows(client, statements):
+    add_venue()
+    statements.clear()
+    client.get('/venues')
+    # The versions behind the ETag come first .
+    assert 'max(venue.updated_at)' in statements[0]
+    assert 'count(' not in statements[0].lower()
+
+
+def test_deleted_venue_changes_the_listing_etag(client):
+    venue = add_venue()
+    add_venue(name='Other')
+    etag = client.get('/venues').headers['ETag']
+    assert client.get('/venues', headers={'If-None-Match': etag}).status_code == 304
+    client.delete(f'/venues/{venue.id}')
+    response = client.get('/venues', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.headers['ETag'] != etag
+
+
+def test_show_starting_changes_last_modified(client):
+    venue, artist = add_venue(), add_artist()
+    show = add_show(venue, artist, days=-1)
+    # Nothing was written since two days ago, but the show started a day ago .
+    written = datetime.utcnow() - timedelta(days=2)
+    for model in (Venue, Show):
+        model.query.update({model.updated_at: written}, synchronize_session=False)
+    db.session.execute(db.update(type(artist)).values(updated_at=written))
+    db.session.commit()
+    since = written + timedelta(hours=1)
+    response = client.get(f'/venues/{venue.id}',
+                          headers={'If-Modified-Since': since.strftime('%a, %d %b %Y %H:%M:%S GMT')})
+    assert response.status_code == 200
+    assert response.last_modified.replace(tzinfo=None) >= show.start_time.replace(tzinfo=None, microsecond=0)
@@ -0,0 +1,67 @@
+import math
+import random
+from datetime import datetime, timedelta
+
+from conflicts import Schedule
+
+DAY = datetime(2030, 1, 1)
+
+
+def hours(start, end):
+    return DAY + timedelta(hours=start), DAY + timedelta(hours=end)
+
+
+def test_find_sees_an_overlapping_interval_before_the_last_one():
+    # Stored shows can overlap on SQLite : the long 10-20 show is hidden
+    # behind the 12-13 one that starts after it .
+    schedule = Schedule()
+    schedule.add(*hours(10, 20), 'show 1')
+    schedule.add(*hours(12, 13), 'show 2')
+    assert schedule.find(*hours(14, 15)) == 'show 1'
+    assert schedule.find(*hours(12, 13)) in ('show 1', 'show 2')
+    assert schedule.find(*hours(20, 21)) is None
+    assert schedule.find(*hours(8, 10)) is None
+
+
+def test_find_between_intervals():
+    schedule = Schedule()
+    for index, start in enumerate([9, 11, 13]):
+        schedule.add(*hours(start, start + 1), f'show {index}')
+    assert schedule.find(*hours(10, 11)) is None
+    assert schedule.find(*hours(10, 12)) == 'show 1'
+    assert schedule.find(*hours(13, 13)) is None
+
+
+
+def height(node):
+    return 1 + max(height(node.left), height(node.right)) if node else 0
+
+
+def test_long_early_interval_keeps_lookups_logarithmic():
+    # One show spanning everything, then many short ones in start order, the
+    # worst case of a sorted list and of an unbalanced tree .
+    schedule = Schedule()
+    schedule.add(*hours(0, 100000), 'long')
+    count = 5000
+    for index in range(count):
+        schedule.add(*hours(index * 2 + 1, index * 2 + 2), f'show {index}')
+    assert height(schedule.root) <= 4 * math.log2(count)
+    assert schedule.find(*hours(50001, 50002)) == 'long'
+    assert schedule.find(*hours(100000, 100001)) is None
+
+
+def test_find_matches_a_linear_scan():
+    rng = random.Random(1)
+    schedule, intervals = Schedule(), []
+    for index in range(300):
+        start = rng.randint(0, 1000)
+        interval = hours(start, start + rng.randint(1, 40))
+        schedule.add(*interval, index)
+        intervals.append(interval)
+    for _ in range(500):
+        start = rng.randint(0, 1000)
+        query = hours(start, start + rng.randint(1, 10))
+        overlapping = {index for index, (begin, finish) in enumerate(intervals)
+                       if begin < query[1] and finish > query[0]}
+        found = schedule.find(*query)
+        assert found in overlapping if overlapping else found is None
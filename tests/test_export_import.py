@@ -0,0 +1,46 @@
+import pytest
+
+from app import create_app
+from conftest import add_artist, add_show, add_venue
+from models import db
+from pages import rebuild_upcoming_shows
+
+
+def export_all(app, directory, fmt):
+    """ Every kind exported to directory, returns {kind: file contents} . """
+    files = {}
+    runner = app.test_cli_runner()
+    for kind in ('venues', 'artists', 'shows'):
+        path = directory / f'{kind}.{fmt}'
+        result = runner.invoke(args=['export', kind, '--format', fmt, '-o', str(path)])
+        assert result.exit_code == 0, result.output
+        files[kind] = path.read_text()
+    return files
+
+
+@pytest.mark.parametrize('fmt', ['ndjson', 'csv'])
+def test_export_imports_back_into_an_empty_database(app, tmp_path, fmt):
+    venue = add_venue(facebook_link=None, website='https://venue.example.com',
+                      timezone='America/Chicago', seeking_talent=True,
+                      seeking_description='Looking for local acts.')
+    add_venue(name='Second', image_link=None)
+    artist = add_artist(facebook_link='https://www.facebook.com/artist', seeking_venue=False)
+    add_show(venue, artist, days=-3)
+    add_show(venue, artist, days=2, hours=3)
+    rebuild_upcoming_shows()
+    db.session.commit()
+    (tmp_path / 'first').mkdir()
+    exported = export_all(app, tmp_path / 'first', fmt)
+
+    empty = create_app()
+    empty.config['TESTING'] = True
+    with empty.app_context():
+        runner = empty.test_cli_runner()
+        for kind in ('venues', 'artists', 'shows'):
+            result = runner.invoke(args=['import', kind, str(tmp_path / 'first' / f'{kind}.{fmt}'),
+                                         '--restart'])
+            assert result.exit_code == 0, result.output
+            assert ', 0 rejected,' in result.output, result.output
+        (tmp_path / 'second').mkdir()
+        assert export_all(empty, tmp_path / 'second', fmt) == exported
+        db.session.remove()
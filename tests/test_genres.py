@@ -0,0 +1,54 @@
+import re
+
+from conftest import add_artist, add_venue
+from models import db, Artist
+
+
+def listed(client, url, kind):
+    """ (ids, {genre: count}) of a /venues or /artists page . """
+    response = client.get(url)
+    assert response.status_code == 200
+    body = response.get_data(as_text=True)
+    ids = [int(id_) for id_ in re.findall(rf'href="/{kind}/(\d+)"', body)]
+    facets = {genre: int(count) for genre, count in
+              re.findall(r'\s*([^<>]+?) <span class="badge">(\d+)</span>', body)}
+    return ids, facets
+
+
+def test_every_genre_has_to_match(client):
+    jazz = add_venue(name='Jazz only')
+    both = add_venue(name='Jazz and Blues', genres=['Jazz', 'Blues'])
+    add_venue(name='Blues only', genres=['Blues'])
+    ids, facets = listed(client, '/venues?genre=Jazz&genre=blues', 'venues')
+    assert ids == [both.id]
+    ids, facets = listed(client, '/venues?genre=jazz', 'venues')
+    assert ids == [jazz.id, both.id]
+    # Counts are what adding the genre to the selection would leave .
+    assert facets == {'Jazz': 2, 'Blues': 1}
+
+
+def test_facet_counts_follow_edits_and_deletes(client):
+    kept = add_artist(name='Kept', genres=['Jazz', 'Soul'])
+    edited = add_artist(name='Edited', genres=['Jazz'])
+    assert listed(client, '/artists', 'artists')[1] == {'Jazz': 2, 'Soul': 1}
+
+    response = client.post(f'/artists/{edited.id}/edit', data={
+        'name': 'Edited', 'city': 'Austin', 'state': 'TX', 'phone': '512-555-0101',
+        'genres': ['Soul', 'Funk'], 'website': '', 'image_link': '', 'facebook_link': '',
+        'description': 'Touring in May.'})
+    assert response.status_code == 302
+    db.session.expire_all()
+    artist = db.session.get(Artist, edited.id)
+    assert artist.seeking_venue is False and artist.seeking_description == 'Touring in May.'
+    assert listed(client, '/artists', 'artists')[1] == {'Funk': 1, 'Jazz': 1, 'Soul': 2}
+    assert listed(client, '/artists?genre=Funk', 'artists')[0] == [edited.id]
+
+    assert client.delete(f'/artists/{kept.id}').status_code == 200
+    assert listed(client, '/artists', 'artists')[1] == {'Funk': 1, 'Soul': 1}
+    assert listed(client, '/artists?genre=Jazz', 'artists')[0] == []
+
+
+def test_unknown_genre_is_a_bad_request(client):
+    add_venue()
+    assert client.get('/venues?genre=Jazz&genre=Polka').status_code == 400
+    assert client.get('/artists?genre=Polka').status_code == 400
@@ -0,0 +1,98 @@
+import json
+import os
+
+import pytest
+
+from bulk import import_rows
+from commands import import_record, write_entities
+from conftest import add_artist, add_venue
+from models import db, Show, Venue
+
+
+def venue_row(name, **columns):
+    return {'name': name, 'city': 'Austin', 'state': 'TX', 'address': '1 Main St',
+            'genres': ['Jazz'], **columns}
+
+
+def write_ndjson(path, rows):
+    path.write_text(''.join(json.dumps(row) + '\n' for row in rows))
+    return str(path)
+
+
+def import_cli(app, *args):
+    result = app.test_cli_runner().invoke(args=['import', *args])
+    assert result.exit_code == 0, result.output
+    return result.output
+
+
+def rejects(path):
+    with open(path + '.rejects.ndjson') as lines:
+        return [json.loads(line) for line in lines]
+
+
+def test_resume_after_a_failed_batch_neither_duplicates_nor_skips_rows(app, tmp_path):
+    names = [f'Venue {index}' for index in range(1, 6)]
+    path = write_ndjson(tmp_path / 'venues.ndjson', [venue_row(name) for name in names])
+    batches = []
+
+    def write_batch(records):
+        # The second batch is written, then fails before its commit .
+        batches.append(records)
+        write_entities(Venue, records)
+        if len(batches) == 2:
+            raise RuntimeError('connection lost')
+
+    with pytest.raises(RuntimeError):
+        import_rows(db.session, path, lambda row: import_record('venues', row), write_batch,
+                    lambda message: None, batch_size=2)
+    assert db.session.scalars(db.select(Venue.name).order_by(Venue.id)).all() == names[:2]
+    with open(path + '.checkpoint') as checkpoint:
+        assert json.load(checkpoint) == {'line': 2}
+
+    output = import_cli(app, 'venues', path, '--batch-size', '2')
+    assert 'Resuming after line 2' in output
+    assert 'Imported 3 rows' in output and '2 skipped' in output
+    assert db.session.scalars(db.select(Venue.name).order_by(Venue.id)).all() == names
+    assert not os.path.exists(path + '.checkpoint')
+
+
+def test_invalid_rows_go_to_the_rejects_file(app, tmp_path):
+    rows = [venue_row('Good'), venue_row('', phone='512-555-0100'), venue_row('Also good'),
+            venue_row('Bad genre', genres=['Polka fusion'])]
+    path = write_ndjson(tmp_path / 'venues.ndjson', rows)
+    output = import_cli(app, 'venues', path)
+    assert ', 2 rejected,' in output
+    assert db.session.scalars(db.select(Venue.name).order_by(Venue.id)).all() == ['Good', 'Also good']
+    rejected = rejects(path)
+    assert [reject['line'] for reject in rejected] == [2, 4]
+    assert rejected[0]['row'] == rows[1] and 'name' in rejected[0]['errors']
+    assert 'genres' in rejected[1]['errors']
+
+
+@pytest.mark.parametrize('batch_size', [1, 10])
+def test_double_booking_inside_the_file_is_rejected(app, tmp_path, batch_size):
+    venue = add_venue()
+    first, second = add_artist(name='First'), add_artist(name='Second')
+    rows = [
+        {'venue_id': venue.id, 'artist_id': first.id, 'start_time': '2030-05-01 20:00:00',
+         'duration': 120},
+        # Same venue, starts before the first show is over .
+        {'venue_id': venue.id, 'artist_id': second.id, 'start_time': '2030-05-01 21:00:00',
+         'duration': 60},
+        {'venue_id': venue.id, 'artist_id': second.id, 'start_time': '2030-05-01 22:00:00',
+         'duration': 60},
+    ]
+    path = write_ndjson(tmp_path / 'shows.ndjson', rows)
+    output = import_cli(app, 'shows', path, '--batch-size', str(batch_size))
+    assert ', 1 rejected,' in output
+    assert db.session.scalars(db.select(Show.artist_id).order_by(Show.start_time)).all() \
+        == [first.id, second.id]
+    (rejected,) = rejects(path)
+    assert rejected['line'] == 2
+    # In one batch the clash is with the other record, across batches with
+    # the committed show .
+    assert rejected['errors']['start_time'][0].startswith('The venue already has')
+    if batch_size > 1:
+        assert 'another show of this import' in rejected['errors']['start_time'][0]
+    db.session.refresh(venue)
+    assert venue.upcoming_shows_count == 2
@@ -0,0 +1,59 @@
+import html
+import re
+
+from conftest import add_artist, add_show, add_venue
+
+SHOWS = 7
+PER_PAGE = 3
+
+
+def add_shows():
+    """ One show a day, each by its own artist, returns the artist ids in
+    start_time order . """
+    venue = add_venue()
+    artists = [add_artist(name=f'Artist {index}') for index in range(SHOWS)]
+    for day, artist in enumerate(artists, start=1):
+        add_show(venue, artist, days=day)
+    return [artist.id for artist in artists]
+
+
+def html_page(client, url):
+    """ (artist ids, prev url, next url) of a /shows page . """
+    body = client.get(url).get_data(as_text=True)
+    links = {rel: html.unescape(href) for rel, href in
+             re.findall(r'<li class="(previous|next)"><a href="([^"]+)"', body)}
+    ids = [int(artist_id) for artist_id in re.findall(r'href="/artists/(\d+)"', body)]
+    return ids, links.get('previous'), links.get('next')
+
+
+def api_page(client, url):
+    """ (artist ids, prev url, next url) of an /api/v1/shows page . """
+    data = client.get(url).get_json()
+    def link(cursor):
+        return f'/api/v1/shows?per_page={PER_PAGE}&cursor={cursor}' if cursor else None
+    return ([show['artist_id'] for show in data['data']],
+            link(data['prev_cursor']), link(data['next_cursor']))
+
+
+def walk(client, fetch, first):
+    """ Pages going forward from first, then back from the last one . """
+    forward, backward = [], []
+    ids, prev_url, next_url = fetch(client, first)
+    forward.append(ids)
+    while next_url:
+        ids, prev_url, next_url = fetch(client, next_url)
+        forward.append(ids)
+    while prev_url:
+        ids, prev_url, next_url = fetch(client, prev_url)
+        backward.append(ids)
+    return forward, backward
+
+
+def test_show_pages_cover_every_show_both_ways(client):
+    artist_ids = add_shows()
+    pages = [artist_ids[first:first + PER_PAGE] for first in range(0, SHOWS, PER_PAGE)]
+    for fetch, first in ((html_page, f'/shows?per_page={PER_PAGE}'),
+                         (api_page, f'/api/v1/shows?per_page={PER_PAGE}')):
+        forward, backward = walk(client, fetch, first)
+        assert forward == pages
+        assert backward == pages[-2::-1]
@@ -0,0 +1,42 @@
+from conftest import add_artist, add_show, add_venue
+
+
+def count_statements(client, statements, url, status=200):
+    statements.clear()
+    response = client.get(url)
+    assert response.status_code == status
+    return len(statements)
+
+
+def test_venues_statements_dont_grow_with_venues(client, statements):
+    artist = add_artist()
+    counts, added = [], 0
+    for total in (1, 10, 120):
+        for index in range(added, total):
+            venue = add_venue(f'Venue {index}', city=f'City {index % 37}')
+            add_show(venue, artist, days=index + 1)
+        added = total
+        counts.append(count_statements(client, statements, '/venues'))
+    assert counts == [counts[0]] * 3
+
+
+def test_detail_pages_statements_dont_grow_with_shows(client, statements):
+    venue, artist = add_venue(), add_artist()
+    counts = {'venue': [], 'artist': []}
+    for days in (-3, -2, -1, 1, 2, 3):
+        add_show(venue, artist, days=days)
+        counts['venue'].append(count_statements(client, statements, f'/venues/{venue.id}'))
+        counts['artist'].append(count_statements(client, statements, f'/artists/{artist.id}'))
+    # Versions for the ETag, then the entity and its shows in one query .
+    assert counts == {'venue': [2] * 6, 'artist': [2] * 6}
+
+
+def test_detail_pages_without_shows(client, statements):
+    venue, artist = add_venue(), add_artist()
+    assert count_statements(client, statements, f'/venues/{venue.id}') == 2
+    assert count_statements(client, statements, f'/artists/{artist.id}') == 2
+
+
+def test_missing_detail_pages_stop_after_one_statement(client, statements):
+    assert count_statements(client, statements, '/venues/404', status=404) == 1
+    assert count_statements(client, statements, '/artists/404', status=404) == 1
@@ -0,0 +1,53 @@
+import config
+from app import create_app
+from models import db, Artist, Show, Venue
+
+
+def app_for(primary, replicas=()):
+    """ App on the primary SQLite file, reading from the replica files . """
+    settings = {name: getattr(config, name) for name in dir(config) if name.isupper()}
+    settings.update(SQLALCHEMY_DATABASE_URI=f'sqlite:///{primary}',
+                    SQLALCHEMY_REPLICA_URIS=[f'sqlite:///{replica}' for replica in replicas],
+                    SQLALCHEMY_ENGINE_OPTIONS={'connect_args': {'check_same_thread': False}})
+    app = create_app(type('ReplicaConfig', (), settings))
+    app.config['TESTING'] = True
+    return app
+
+
+def seed(database, name):
+    """ Tables and a venue named name in database, the replica and the
+    primary tell apart by the name . """
+    app = app_for(database)
+    with app.app_context():
+        db.session.add_all([Venue(name=name, city='Austin', state='TX', genres=['Jazz'],
+                                  timezone='America/Chicago'),
+                            Artist(name='Artist', city='Austin', state='TX', genres=['Jazz'])])
+        db.session.commit()
+
+
+def shows_in(database):
+    with app_for(database).app_context():
+        return Show.query.count()
+
+
+def test_reads_go_to_the_replica_and_writes_to_the_primary(tmp_path):
+    primary, replica = tmp_path / 'primary.db', tmp_path / 'replica.db'
+    seed(primary, 'Primary venue')
+    seed(replica, 'Replica venue')
+    app = app_for(primary, [replica])
+    writer, reader = app.test_client(), app.test_client()
+    assert b'Replica venue' in writer.get('/venues/1').data
+    writer.post('/shows/create', data={'venue_id': 1, 'artist_id': 1,
+                                       'start_time': '2030-01-01 20:00:00'})
+    assert (shows_in(primary), shows_in(replica)) == (1, 0)
+    # The browser that wrote reads its own write, the others stay on the replica .
+    assert b'Primary venue' in writer.get('/venues/1').data
+    assert b'Replica venue' in reader.get('/venues/1').data
+
+
+def test_unreachable_replica_falls_back_to_the_primary(tmp_path):
+    primary = tmp_path / 'primary.db'
+    seed(primary, 'Primary venue')
+    app = app_for(primary, [tmp_path / 'missing' / 'replica.db'])
+    assert b'Primary venue' in app.test_client().get('/venues/1').data
+    assert set(app.extensions['replica_router'].status().values()) == {'down'}
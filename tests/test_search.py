@@ -0,0 +1,63 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.schema import CreateIndex
+
+from conftest import add_venue
+from models import db, Venue
+from pages import searcher, soft_delete
+from search import MemorySearch, PostgresSearch, genres_overlap, matching_genres
+from test_view_cache import rename_venue, worker
+
+
+def names(page):
+    return [entity.name for entity in page.items]
+
+
+def test_genre_tokens_compile_to_array_overlap():
+    genres = matching_genres('jaz')
+    assert genres == ['Jazz']
+    sql = str(genres_overlap(Venue.genres, genres).compile(dialect=postgresql.dialect()))
+    assert sql.startswith('venue.genres && CAST(ARRAY[')
+
+
+def test_name_tokens_match_fuzzily_on_the_trigram_index(app):
+    sql = str(PostgresSearch(Venue).query(db.session, 'jaxx club').statement
+              .compile(dialect=postgresql.dialect())).replace('%%', '%')
+    assert sql.count('venue.name %> ') == 2
+    index = next(index for index in Venue.__table__.indexes if index.name == 'ix_venue_name_trgm')
+    assert 'USING gin (name gin_trgm_ops)' in str(CreateIndex(index).compile(dialect=postgresql.dialect()))
+
+
+def test_memory_search_sees_the_writes_of_other_workers(tmp_path):
+    first, second = worker(tmp_path / 'fyyur.db'), worker(tmp_path / 'fyyur.db')
+    with first.app_context():
+        db.session.add(Venue(name='Blue Lounge', city='Austin', state='TX', genres=['Jazz']))
+        db.session.commit()
+    with second.app_context():
+        assert names(searcher(Venue).search(db.session, 'blue')) == ['Blue Lounge']
+    # Written through the first worker, its handlers only reach its own index .
+    rename_venue(first, 1, 'Red Lounge')
+    with first.app_context():
+        db.session.add(Venue(name='Blue Room', city='Austin', state='TX', genres=['Jazz']))
+        db.session.commit()
+    with second.app_context():
+        assert names(searcher(Venue).search(db.session, 'blue')) == ['Blue Room']
+        assert names(searcher(Venue).search(db.session, 'red')) == ['Red Lounge']
+    with first.app_context():
+        soft_delete(Venue, 2)
+        db.session.commit()
+    with second.app_context():
+        assert names(searcher(Venue).search(db.session, 'blue')) == []
+
+
+def test_memory_search_skips_deleted_rows_still_in_the_index(app):
+    add_venue(name='Blue Lounge')
+    engine = MemorySearch(Venue)
+    assert names(engine.search(db.session, 'blue')) == ['Blue Lounge']
+    # Deleted without a newer updated_at, as seen by a worker that synced later .
+    db.session.execute(db.update(Venue).values(deleted_at=datetime.utcnow(),
+                                                updated_at=Venue.updated_at))
+    db.session.commit()
+    engine.synced_at += timedelta(minutes=5)
+    assert names(engine.search(db.session, 'blue')) == []
@@ -0,0 +1,46 @@
+from conftest import add_artist, add_show, add_venue
+from conflicts import ConflictChecker
+from models import db, Show, VenueGenre
+from pages import live
+
+
+def test_shows_of_a_deleted_venue_free_their_artist(client):
+    venue, other = add_venue(), add_venue(name='Other')
+    artist = add_artist()
+    show = add_show(venue, artist)
+    record = {'venue_id': other.id, 'artist_id': artist.id,
+              'start_time': show.start_time, 'end_time': show.end_time}
+    assert ConflictChecker().load(db.session, Show, [record], *live(Show)).check(record)
+    assert client.delete(f'/venues/{venue.id}').get_json() == {'success': True}
+    assert ConflictChecker().load(db.session, Show, [record], *live(Show)).check(record) == []
+
+
+def test_delete_doesnt_grow_with_the_venue_history(client, statements):
+    counts = []
+    for past_shows in (1, 40):
+        venue, artist = add_venue(), add_artist()
+        for day in range(past_shows):
+            add_show(venue, artist, days=-day - 1)
+        upcoming = add_show(venue, artist, days=1)
+        statements.clear()
+        assert client.delete(f'/venues/{venue.id}').status_code == 200
+        counts.append(len(statements))
+        db.session.expire_all()
+        assert upcoming.cancelled
+        assert Show.query.filter_by(venue_id=venue.id, cancelled=True).count() == 1
+    assert counts[0] == counts[1]
+
+
+def test_purge_releases_counters_and_genre_rows(app, client):
+    venue = add_venue()
+    artist = add_artist(upcoming_shows_count=1)
+    add_show(venue, artist)
+    client.delete(f'/venues/{venue.id}')
+    # Left for the purge, the delete only tombstones the venue .
+    assert VenueGenre.query.count() == 1
+    result = app.test_cli_runner().invoke(args=['purge-deleted'])
+    assert result.exit_code == 0, result.output
+    db.session.expire_all()
+    assert artist.upcoming_shows_count == 0
+    assert Show.query.count() == 0
+    assert VenueGenre.query.count() == 0
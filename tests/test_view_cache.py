@@ -0,0 +1,35 @@
+import config
+from app import create_app
+from models import db, Venue
+
+
+def worker(database):
+    """ An app like a second gunicorn worker : same database, its own
+    in-process view cache . """
+    settings = {name: getattr(config, name) for name in dir(config) if name.isupper()}
+    settings.update(SQLALCHEMY_DATABASE_URI=f'sqlite:///{database}', CACHE_BACKEND='memory',
+                    SQLALCHEMY_ENGINE_OPTIONS={'connect_args': {'check_same_thread': False}})
+    app = create_app(type('WorkerConfig', (), settings))
+    app.config['TESTING'] = True
+    return app
+
+
+def rename_venue(app, venue_id, name):
+    with app.app_context():
+        db.session.get(Venue, venue_id).name = name
+        db.session.commit()
+
+
+def test_workers_dont_serve_pages_cached_before_another_workers_write(tmp_path):
+    first, second = worker(tmp_path / 'fyyur.db'), worker(tmp_path / 'fyyur.db')
+    with first.app_context():
+        db.session.add(Venue(name='Old name', city='Austin', state='TX', genres=['Jazz']))
+        db.session.commit()
+    client = second.test_client()
+    before = client.get('/venues/1')
+    assert b'Old name' in before.data and b'Old name' in client.get('/venues').data
+    # The write and its cache invalidation happen in the first worker only .
+    rename_venue(first, 1, 'New name')
+    after = client.get('/venues/1')
+    assert b'New name' in after.data and after.headers['ETag'] != before.headers['ETag']
+    assert b'New name' in client.get('/venues').data
@@ -0,0 +1,196 @@
+from itertools import groupby
+
+from flask import Blueprint, abort, current_app, flash, jsonify, redirect, render_template, request, url_for
+
+from dates import DEFAULT_TIMEZONE, is_timezone
+from models import db, Artist, Show, Venue, VenueGenre, VENUE_FIELDS, to_dict
+from pages import (VENUE_SHOW_COLUMNS, cancel_shows, conditional, detail_last_modified, detail_page,
+                   detail_versions, genre_facets, genre_filter, live, paginate, requested_genres,
+                   search_page, searcher, soft_delete, split_shows, table_versions,
+                   venue_namespaces, venue_show, view_cache)
+from replicas import replica_reads
+
+bp = Blueprint('venues', __name__)
+
+
+#  Venues
+#  ----------------------------------------------------------------
+
+@bp.route('/venues')
+def venues():
+    genres = requested_genres()
+    def build():
+        # One query for a page of venues and their upcoming show count, ordered so
+        # consecutive rows share an area and can be grouped in a single pass.
+        query = db.session.query(Venue.id, Venue.name, Venue.city, Venue.state, Venue.updated_at,
+                                 Venue.upcoming_shows_count.label('num_upcoming_shows'))\
+            .filter(*live(Venue))
+        if genres:
+            query = query.filter(Venue.id.in_(genre_filter(VenueGenre, 'venue_id', genres)))
+        page = paginate(query, [Venue.city, Venue.state, Venue.id],
+                        key=lambda row: (row.city, row.state, row.id))
+        _data = []
+        for (city, state), venues in groupby(page.items, key=lambda row: (row.city, row.state)):
+            _data.append({
+                'city': city,
+                'state': state,
+                'venues': [{'id': venue.id, 'name': venue.name, 'updated_at': venue.updated_at,
+                            'num_upcoming_shows': venue.num_upcoming_shows} for venue in venues]
+            })
+        return _data, page._replace(items=None), genre_facets(VenueGenre, 'venue_id', genres)
+    def render():
+        _data, page, facets = view_cache.get_or_set('venues', [request.query_string.decode(), *versions], build)
+        return render_template('pages/venues.html', areas=_data, page=page, facets=facets)
+    versions = table_versions(Venue)
+    return conditional(versions, versions[0], render)
+
+
+#  Search route
+@bp.route('/venues/search', methods=['POST'])
+@replica_reads
+def search_venues():
+    response = search_page(Venue)
+    return render_template('pages/search_venues.html', results=response, search_term=request.form.get('search_term', ''))
+
+
+# All Venues
+@bp.route('/venues/<int:venue_id>')
+def show_venue(venue_id):
+    datetime_ = "2035-04-15T20:00:00.000Z"
+    def build():
+        # The venue and all its shows in one query, split around a single now .
+        rows = db.session.query(Venue, *VENUE_SHOW_COLUMNS).select_from(Venue)\
+            .outerjoin(Show, db.and_(Show.venue_id == Venue.id, *live(Show)))\
+            .outerjoin(Artist, Artist.id == Show.artist_id)\
+            .filter(Venue.id == venue_id, *live(Venue))\
+            .order_by(Show.start_time).all()
+        if not rows:
+            return None
+        _venue = rows[0][0]
+        past_shows, upcomingShow = split_shows(rows, venue_show)
+        return detail_page(_venue, VENUE_FIELDS, past_shows, upcomingShow)
+    def render():
+        venue = view_cache.get_or_set(f'venue:{venue_id}', versions, build)
+        if venue is None:
+            abort(404)
+        return render_template('pages/show_venue.html', venue=venue, datetime=datetime_)
+    versions = detail_versions(Venue, venue_id, Show.venue_id, Artist, Show.artist_id)
+    if versions is None:
+        abort(404)
+    return conditional(versions, detail_last_modified(versions), render)
+
+#  Create Venue
+#  ----------------------------------------------------------------
+
+
+@bp.route('/venues/create', methods=['GET'])
+def create_venue_form():
+    from forms import VenueForm
+    form = VenueForm()
+    return render_template('forms/new_venue.html', form=form)
+
+
+@bp.route('/venues/create', methods=['POST'])
+def create_venue_submission():
+    try:
+        name = request.form['name']
+        city = request.form['city']
+        state = request.form['state']
+        address = request.form['address']
+        timezone = request.form.get('timezone') or DEFAULT_TIMEZONE
+        if not is_timezone(timezone):
+            raise ValueError(f'Unknown timezone {timezone}')
+        phone = request.form['phone']
+        image_link = request.form['image_link']
+        website = request.form['website']
+        description = request.form['description']
+        genres = request.form.getlist('genres')
+        facebook_link = request.form['facebook_link']
+        seeking_talent = request.form.get('talent')
+        if seeking_talent:
+            seeking_talent = True
+        else:
+            seeking_talent = False
+        venue = Venue(name=name, city=city, state=state, address=address,
+                      timezone=timezone, phone=phone, image_link=image_link, genres=genres,
+                      website=website, facebook_link=facebook_link,
+                      seeking_talent=seeking_talent, seeking_description=description)
+        db.session.add(venue)
+        db.session.commit()
+        searcher(Venue).add(venue)
+        view_cache.invalidate(f'venue:{venue.id}', 'venues')
+        # on successful db insert, flash success
+        flash('Venue ' + request.form['name'] + ' was successfully listed!')
+    except Exception:
+        flash('Venue ' + request.form['name'] + ' was unsuccessfully listed!')
+        current_app.logger.exception('Creating a venue failed')
+        db.session.rollback()
+    # e.g., flash('An error occurred. Venue ' + data.name + ' could not be listed.')
+    # see: http://flask.pocoo.org/docs/1.0/patterns/flashing/
+    return render_template('pages/home.html')
+
+#  EDIT Venue , Get data
+@bp.route('/venues/<int:venue_id>/edit', methods=['GET'])
+def edit_venue(venue_id):
+    from forms import VenueForm
+    _venue = Venue.query.get(venue_id)
+    venue = {
+        **to_dict(_venue, VENUE_FIELDS),
+        "talent": _venue.seeking_talent,
+        "description": _venue.seeking_description,
+    }
+    form = VenueForm(obj=_venue)
+    return render_template('forms/edit_venue.html', form=form, venue=venue)
+
+# EDIT Venue , send update data .
+@bp.route('/venues/<int:venue_id>/edit', methods=['POST'])
+def edit_venue_submission(venue_id):
+    try:
+        venue = Venue.query.get(venue_id)
+        venue.name = request.form['name']
+        venue.address = request.form['address']
+        timezone = request.form.get('timezone') or venue.timezone
+        if not is_timezone(timezone):
+            raise ValueError(f'Unknown timezone {timezone}')
+        venue.timezone = timezone
+        venue.genres = request.form.getlist('genres')
+        venue.city = request.form['city']
+        venue.state = request.form['state']
+        venue.phone = request.form['phone']
+        venue.website = request.form['website']
+        venue.facebook_link = request.form['facebook_link']
+        seeking_venue = request.form.get('talent')
+        if seeking_venue == 'y':
+            venue.seeking_talent = True
+
+        venue.seeking_description = request.form['description']
+        venue.image_link = request.form['image_link']
+        stale = venue_namespaces(venue_id)
+        db.session.commit()
+        searcher(Venue).add(venue)
+        view_cache.invalidate(*stale)
+        flash(' Venue ' + venue.name + ' Updated ')
+    except Exception:
+        current_app.logger.exception('Updating venue %s failed', venue_id)
+        db.session.rollback()
+    return redirect(url_for('venues.show_venue', venue_id=venue_id))
+# DELETE Venue by ID .
+@bp.route('/venues/<int:venue_id>', methods=['DELETE'])
+def delete_venue(venue_id):
+    # The venue is tombstoned and its upcoming shows cancelled, its counters,
+    # genre index rows and shows are left to purge-deleted .
+    try:
+        name = soft_delete(Venue, venue_id)
+        if name is None:
+            return jsonify({'success': False}), 404
+        stale = venue_namespaces(venue_id)
+        cancel_shows(Show.venue_id == venue_id)
+        db.session.commit()
+        searcher(Venue).remove(venue_id)
+        view_cache.invalidate(*stale)
+        flash(f'{name} Venue was deleted')
+    except Exception:
+        current_app.logger.exception('Deleting venue %s failed', venue_id)
+        db.session.rollback()
+        return jsonify({'success': False}), 500
+    return jsonify({'success': True})
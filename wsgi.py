@@ -0,0 +1,54 @@
+"""
+Production entry point :
+
+    $ gunicorn -c gunicorn.conf.py wsgi:app
+
+With preload_app the master imports this module once, compiles every
+template, answers a few warm-up requests and then forks, each worker opens
+its own pool connections before it takes a request ( see gunicorn.conf.py ) .
+"""
+from app import create_app
+from fragments import compile_templates
+from models import db
+
+app = create_app()
+
+
+def warm_templates():
+    """ Compile every template into the Jinja cache, workers forked after
+    this share the compiled code . Loaded from the bytecode cache when
+    `flask compile-templates` ran at deploy . """
+    compile_templates(app.jinja_env)
+
+
+def warm_requests(paths=('/', '/venues', '/artists', '/shows')):
+    """ Answer a few requests in the master so SQL compilation, url
+    matching and the babel locale data are loaded before the fork . """
+    client = app.test_client()
+    for path in paths:
+        try:
+            client.get(path)
+        except Exception as exp:
+            app.logger.warning(f'Warm-up request {path} failed: {exp}')
+
+
+def warm_pool():
+    """ Drop connections inherited from the master and open pool_size new
+    ones, so no request pays for a connect . """
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
+            size = engine.pool.size() if hasattr(engine.pool, 'size') else 1
+            connections = []
+            try:
+                for _ in range(size):
+                    connections.append(engine.connect())
+            except Exception as exp:
+                app.logger.warning(f'Pool warm-up of {engine.url!r} stopped: {exp}')
+            finally:
+                for connection in connections:
+                    connection.close()
+
+
+warm_templates()
+warm_requests()